@@ -1,114 +1,232 @@
 import csv
 import gzip
+import hashlib
+import os
 import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # cache is skipped without pyarrow
+    pa = None
+
+from table_schema import write_table
 
 # ---------------- CONFIG ----------------
 RT_CSV_IN = "rt_movies.csv"          # downloaded CSV from the Reddit/Drive link
 IMDB_BASICS_GZ = "title.basics.tsv.gz"
 IMDB_RATINGS_GZ = "title.ratings.tsv.gz"
 
-OUT_CSV = "tableB.csv"
+CACHE_DIR = ".imdb_cache"               # parsed IMDb indexes (Feather); safe to delete
+OUT_TABLE = "tableB.csv"              # .csv, .parquet or .feather (see table_schema.py)
 TARGET_ROWS = 1000
 MIN_YEAR = 1970
 MAX_YEAR = 2000
 
-FIELDS = [
-    "ID",
-    "title",
-    "release_year",
-    "genre",
-    "director",
-    "runtime_minutes",
-    "imdb_rating",
-    "rotten_tomatoes_score",
-]
-
 # ---------------- HELPERS ----------------
 def clean(s):
     return re.sub(r"\s+", " ", (s or "")).strip()
 
-def norm_title(s):
-    s = clean(s).lower()
-    s = re.sub(r"[\u2018\u2019\u201c\u201d]", "", s)  # smart quotes
-    s = re.sub(r"[^a-z0-9]+", "", s)
-    return s
-
 def year_from_text(s):
     m = re.search(r"(19\d{2}|20\d{2})", s or "")
     return int(m.group(1)) if m else 0
 
-def to_int(s):
-    try:
-        return int(s)
-    except:
-        return 0
-
 def open_gz_text(path):
     return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
 
 # ---------------- LOAD IMDB ----------------
-def load_imdb_ratings(path_gz):
+# The dumps are read in CHUNK_ROWS-row chunks with only the needed columns, and
+# every filter runs on the chunk, so peak memory is one chunk plus the (small)
+# horror subset no matter how big the dump is.
+CHUNK_ROWS = 250_000
+
+def read_imdb_chunks(path_gz, usecols):
+    return pd.read_csv(
+        path_gz,
+        sep="\t",
+        compression="gzip",
+        usecols=usecols,
+        dtype=str,
+        na_values=[r"\N"],
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+        encoding="utf-8",
+        encoding_errors="replace",
+        on_bad_lines="skip",
+        chunksize=CHUNK_ROWS,
+    )
+
+def norm_title_series(s):
+    # title join key over a whole column: lowercase, everything but [a-z0-9] goes
+    return s.str.replace(r"\s+", " ", regex=True).str.strip().str.lower().str.replace(r"[^a-z0-9]+", "", regex=True)
+
+def load_imdb_ratings(path_gz, tconsts=None):
+    # tconst -> averageRating; with `tconsts`, only those titles are kept (semi-join)
     ratings = {}
-    with open_gz_text(path_gz) as f:
-        header = f.readline()
-        for line in f:
-            parts = line.rstrip("\n").split("\t")
-            if len(parts) < 2:
-                continue
-            tconst = parts[0]
-            avg = parts[1]
-            if tconst and avg and avg != r"\N":
-                ratings[tconst] = avg
+    for chunk in read_imdb_chunks(path_gz, ["tconst", "averageRating"]):
+        chunk = chunk.dropna()
+        chunk = chunk[chunk["averageRating"] != ""]
+        if tconsts is not None:
+            chunk = chunk[chunk["tconst"].isin(tconsts)]
+        ratings.update(zip(chunk["tconst"], chunk["averageRating"]))
     return ratings
 
 def load_imdb_horror_index(path_gz):
     # Build lookup: (norm_title, startYear) -> (tconst, runtimeMinutes, genres_str)
-    idx = {}
+    need = ["tconst", "primaryTitle", "startYear", "runtimeMinutes", "genres", "titleType"]
     with open_gz_text(path_gz) as f:
         header = f.readline().rstrip("\n").split("\t")
-        col = {name: i for i, name in enumerate(header)}
-
-        need = ["tconst", "primaryTitle", "startYear", "runtimeMinutes", "genres", "titleType"]
-        for n in need:
-            if n not in col:
-                raise RuntimeError(f"Missing column in IMDb basics: {n}")
-
-        for line in f:
-            parts = line.rstrip("\n").split("\t")
-            if len(parts) <= max(col.values()):
-                continue
-
-            title_type = parts[col["titleType"]]
-            if title_type != "movie":
-                continue
-
-            start_year = parts[col["startYear"]]
-            y = to_int(start_year)
-            if y < MIN_YEAR or y > MAX_YEAR:
-                continue
+    for n in need:
+        if n not in header:
+            raise RuntimeError(f"Missing column in IMDb basics: {n}")
 
-            genres = parts[col["genres"]]
-            if not genres or genres == r"\N":
-                continue
-
-            # Keep only horror (IMDb genres are comma-separated)
-            if "Horror" not in genres.split(","):
-                continue
+    idx = {}
+    for chunk in read_imdb_chunks(path_gz, need):
+        chunk = chunk[chunk["titleType"] == "movie"]
 
-            title = parts[col["primaryTitle"]]
-            if not title or title == r"\N":
-                continue
+        years = pd.to_numeric(chunk["startYear"], errors="coerce")
+        chunk = chunk[(years >= MIN_YEAR) & (years <= MAX_YEAR)]
 
-            tconst = parts[col["tconst"]]
-            runtime = parts[col["runtimeMinutes"]]
-            runtime = "" if (not runtime or runtime == r"\N") else runtime
+        # Keep only horror (IMDb genres are comma-separated)
+        chunk = chunk[chunk["genres"].str.contains(r"(?:^|,)Horror(?:,|$)", na=False)]
+        chunk = chunk[chunk["primaryTitle"].fillna("") != ""]
+        if chunk.empty:
+            continue
 
-            key = (norm_title(title), y)
+        keys = zip(norm_title_series(chunk["primaryTitle"]), pd.to_numeric(chunk["startYear"]).astype(int))
+        values = zip(chunk["tconst"], chunk["runtimeMinutes"].fillna(""), chunk["genres"])
+        for key, value in zip(keys, values):
             # Keep first match; good enough for this assignment scale
             if key not in idx:
-                idx[key] = (tconst, runtime, genres)
+                idx[key] = value
     return idx
 
+# ---------------- IMDB CACHE ----------------
+# The parsed horror index and ratings map are stored as Feather files. The file
+# name is a hash of the input fingerprints plus MIN_YEAR/MAX_YEAR, so a changed
+# dump or year range simply misses and rebuilds. Hits are memory-mapped.
+FINGERPRINT_SAMPLE = 1 << 20
+
+def file_fingerprint(path):
+    # size + mtime + hash of the first and last MiB; hashing the whole multi-GB
+    # dump would cost as much as the parse the cache is meant to skip
+    st = os.stat(path)
+    h = hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_SAMPLE))
+        if st.st_size > FINGERPRINT_SAMPLE:
+            f.seek(max(st.st_size - FINGERPRINT_SAMPLE, FINGERPRINT_SAMPLE))
+            h.update(f.read(FINGERPRINT_SAMPLE))
+    return h.hexdigest()
+
+def cache_path(kind, *fingerprints):
+    key = "|".join(fingerprints + (str(MIN_YEAR), str(MAX_YEAR)))
+    return os.path.join(CACHE_DIR, f"{kind}_{hashlib.sha1(key.encode()).hexdigest()[:16]}.feather")
+
+def read_cache(path):
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        return feather.read_table(path, memory_map=True).to_pydict()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+def write_cache(path, columns):
+    if pa is None:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    feather.write_feather(pa.table(columns), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+def load_imdb_cached(basics_gz, ratings_gz):
+    basics_fp = file_fingerprint(basics_gz)
+    horror_path = cache_path("horror", basics_fp)
+    # ratings are semi-joined on the horror set, so they depend on both files
+    ratings_path = cache_path("ratings", basics_fp, file_fingerprint(ratings_gz))
+
+    cols = read_cache(horror_path)
+    if cols is not None:
+        idx = {
+            (t, y): (tc, rt, g)
+            for t, y, tc, rt, g in zip(cols["norm_title"], cols["year"], cols["tconst"],
+                                       cols["runtime"], cols["genres"])
+        }
+        print(f"[+] IMDb horror index from cache ({len(idx)} titles)")
+    else:
+        idx = load_imdb_horror_index(basics_gz)
+        keys, values = list(idx.keys()), list(idx.values())
+        write_cache(horror_path, {
+            "norm_title": [k[0] for k in keys],
+            "year": [k[1] for k in keys],
+            "tconst": [v[0] for v in values],
+            "runtime": [v[1] for v in values],
+            "genres": [v[2] for v in values],
+        })
+
+    cols = read_cache(ratings_path)
+    if cols is not None:
+        ratings = dict(zip(cols["tconst"], cols["rating"]))
+    else:
+        ratings = load_imdb_ratings(ratings_gz, {v[0] for v in idx.values()})
+        write_cache(ratings_path, {"tconst": list(ratings.keys()), "rating": list(ratings.values())})
+
+    return idx, ratings
+
+# ---------------- FUZZY FALLBACK ----------------
+# RT rows whose exact (norm_title, year) key is not in the IMDb horror index get
+# a second chance: candidates come from a per-year trigram inverted index, and
+# the FUZZY_TOP titles sharing the most trigrams are scored by edit distance.
+# The RT dump covers every genre, so a near miss is only accepted when it is
+# clearly the same title: at most one edit per FUZZY_CHARS_PER_EDIT characters
+# (short titles like "alien" vs "aliens" need an exact key), and no other
+# candidate as close. Trigrams found in more than MAX_POSTING titles of a year
+# are skipped, so a lookup is bounded no matter how big the IMDb set is.
+FUZZY_JOIN = True
+FUZZY_CHARS_PER_EDIT = 10
+FUZZY_TOP = 10
+MAX_POSTING = 500
+
+def trigrams(norm):
+    if len(norm) <= 3:
+        return {norm} if norm else set()
+    return {norm[i:i + 3] for i in range(len(norm) - 2)}
+
+class TrigramIndex:
+    def __init__(self, keys):
+        # keys: (norm_title, year) pairs, e.g. the IMDb horror index
+        self.keys = list(keys)
+        self.postings = defaultdict(lambda: defaultdict(list))  # year -> trigram -> key ids
+        for i, (norm, y) in enumerate(self.keys):
+            for gram in trigrams(norm):
+                self.postings[y][gram].append(i)
+
+    def lookup(self, norm, year, top=FUZZY_TOP, chars_per_edit=FUZZY_CHARS_PER_EDIT):
+        # closest (norm_title, year) key for this title in the same year, or
+        # None when it is over the edit allowance or not the unique closest
+        max_edits = len(norm) // chars_per_edit
+        postings = self.postings.get(year)
+        if not postings or not max_edits:
+            return None
+        hits = Counter()
+        for gram in trigrams(norm):
+            ids = postings.get(gram, ())
+            if len(ids) <= MAX_POSTING:
+                hits.update(ids)
+        if not hits:
+            return None
+        cands = [self.keys[i] for i, _ in hits.most_common(top)]
+        close = process.extract(norm, [k[0] for k in cands], scorer=Levenshtein.distance,
+                                score_cutoff=max_edits, limit=None)
+        if not close or (len(close) > 1 and close[1][1] == close[0][1]):
+            return None
+        return cands[close[0][2]]
+
 # ---------------- LOAD RT CSV ----------------
 def sniff_rt_columns(fieldnames):
     # Try common variations. We only need title, release date/year, critic score.
@@ -127,8 +245,7 @@ def sniff_rt_columns(fieldnames):
     return col_title, col_release, col_critic
 
 def main():
-    imdb_ratings = load_imdb_ratings(IMDB_RATINGS_GZ)
-    imdb_horror = load_imdb_horror_index(IMDB_BASICS_GZ)
+    imdb_horror, imdb_ratings = load_imdb_cached(IMDB_BASICS_GZ, IMDB_RATINGS_GZ)
 
     out_rows = []
     seen_ids = set()
@@ -144,39 +261,62 @@ def main():
                 "Expected something like: title, release_date, critic_score/tomatometer."
             )
 
-        for row in r:
+        rows = list(r)
+
+    # join keys for every RT title in one vectorized pass
+    norm_keys = norm_title_series(pd.Series([row.get(col_title, "") or "" for row in rows], dtype=object))
+
+    def add_row(key, title, y, score):
+        tconst, runtime, genres = imdb_horror[key]
+        if not tconst or tconst in seen_ids:
+            return
+
+        imdb_rating = imdb_ratings.get(tconst, "")
+
+        out_rows.append({
+            "ID": tconst,                      # stable unique ID
+            "title": title,
+            "release_year": str(y),
+            "genre": "Horror",                 # enforced via IMDb filter
+            "director": "",                    # not available from these two datasets
+            "runtime_minutes": runtime,
+            "imdb_rating": imdb_rating,
+            "rotten_tomatoes_score": re.sub(r"[^\d]", "", score)  # keep digits only
+        })
+        seen_ids.add(tconst)
+
+    unmatched = []  # (norm, title, year, score) of in-range rows with no exact key
+    for row, norm in zip(rows, norm_keys):
+        if len(out_rows) >= TARGET_ROWS:
+            break
+
+        title = clean(row.get(col_title, ""))
+        rel = clean(row.get(col_release, ""))
+        score = clean(row.get(col_critic, ""))
+
+        y = year_from_text(rel)
+        if y < MIN_YEAR or y > MAX_YEAR:
+            continue
+
+        key = (norm, y)
+        if key not in imdb_horror:
+            unmatched.append((norm, title, y, score))
+            continue
+
+        add_row(key, title, y, score)
+
+    # second pass only when exact keys fell short, so a full exact run is unchanged
+    if FUZZY_JOIN and unmatched and len(out_rows) < TARGET_ROWS:
+        exact = len(out_rows)
+        title_index = TrigramIndex(imdb_horror.keys())
+        for norm, title, y, score in unmatched:
             if len(out_rows) >= TARGET_ROWS:
                 break
-
-            title = clean(row.get(col_title, ""))
-            rel = clean(row.get(col_release, ""))
-            score = clean(row.get(col_critic, ""))
-
-            y = year_from_text(rel)
-            if y < MIN_YEAR or y > MAX_YEAR:
-                continue
-
-            key = (norm_title(title), y)
-            if key not in imdb_horror:
-                continue
-
-            tconst, runtime, genres = imdb_horror[key]
-            if not tconst or tconst in seen_ids:
-                continue
-
-            imdb_rating = imdb_ratings.get(tconst, "")
-
-            out_rows.append({
-                "ID": tconst,                      # stable unique ID
-                "title": title,
-                "release_year": str(y),
-                "genre": "Horror",                 # enforced via IMDb filter
-                "director": "",                    # not available from these two datasets
-                "runtime_minutes": runtime,
-                "imdb_rating": imdb_rating,
-                "rotten_tomatoes_score": re.sub(r"[^\d]", "", score)  # keep digits only
-            })
-            seen_ids.add(tconst)
+            key = title_index.lookup(norm, y)
+            if key is not None:
+                add_row(key, title, y, score)
+        print(f"[+] Fuzzy title join added {len(out_rows) - exact} rows "
+              f"({len(unmatched)} RT rows had no exact match).")
 
     if len(out_rows) < TARGET_ROWS:
         print(f"[!] Only built {len(out_rows)} rows. Common causes:")
@@ -186,12 +326,9 @@ def main():
     else:
         print(f"[+] Built {len(out_rows)} rows.")
 
-    with open(OUT_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS)
-        w.writeheader()
-        w.writerows(out_rows)
+    write_table(out_rows, OUT_TABLE)
 
-    print(f"[+] Wrote {len(out_rows)} rows to {OUT_CSV}")
+    print(f"[+] Wrote {len(out_rows)} rows to {OUT_TABLE}")
 
 if __name__ == "__main__":
     main()
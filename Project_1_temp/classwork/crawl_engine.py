@@ -0,0 +1,109 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+
+# Async fetch engine for the wiki crawlers: a bounded pool of concurrent requests
+# behind a token bucket, so throughput is capped by the host's allowed rate
+# instead of a fixed sleep after every page.
+
+CONCURRENCY = 8
+RATE = 5.0        # requests per second, sustained
+BURST = 5         # requests allowed back to back before the rate kicks in
+RETRIES = 3
+TIMEOUT = 30
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        # the lock keeps waiters in FIFO order; only the head of the queue sleeps
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff(attempt: int, base: float) -> float:
+    # same schedule get() used (base + 2s per attempt) with full jitter on top
+    return base + attempt * 2 + random.uniform(0, 1 + attempt)
+
+
+def retry_after(resp) -> float:
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return 0.0
+
+
+class Fetcher:
+    def __init__(self, headers=None, concurrency=CONCURRENCY, rate=RATE, burst=BURST,
+                 retries=RETRIES, timeout=TIMEOUT):
+        self.headers = headers or {}
+        self.sem = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def fetch(self, url: str, headers=None):
+        # (status, text, response headers); a 304 comes back with text None.
+        # 429/5xx and network errors back off without holding a pool slot,
+        # so other fetches keep going while this one waits.
+        for attempt in range(self.retries):
+            wait = 0.0
+            await self.bucket.acquire()
+            async with self.sem:
+                try:
+                    async with self.session.get(url, headers=headers) as r:
+                        if r.status == 304:
+                            return 304, None, r.headers
+                        if r.status == 429 or r.status >= 500:
+                            wait = max(retry_after(r), backoff(attempt, 3))
+                        else:
+                            r.raise_for_status()
+                            # bytes that don't fit the declared charset become
+                            # U+FFFD, as requests' r.text did, instead of failing
+                            return r.status, await r.text(errors="replace"), r.headers
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    wait = backoff(attempt, 2)
+            await asyncio.sleep(wait)
+        raise RuntimeError(f"Failed after retries: {url}")
+
+    async def get(self, url: str) -> str:
+        _, text, _ = await self.fetch(url)
+        return text
+
+    async def fetch_many(self, requests):
+        # requests: [(url, headers)]; results in input order, failures as None
+        async def one(url, headers):
+            try:
+                return await self.fetch(url, headers)
+            except (RuntimeError, aiohttp.ClientError):
+                return None
+
+        return await asyncio.gather(*(one(u, h) for u, h in requests))
+
+    async def get_many(self, urls):
+        # (url, html or None) in input order
+        results = await self.fetch_many([(u, None) for u in urls])
+        return [(u, res[1] if res else None) for u, res in zip(urls, results)]
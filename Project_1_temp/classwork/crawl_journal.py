@@ -0,0 +1,95 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+# Crawl journal shared by the wiki crawlers. One SQLite row per URL records the
+# last response (status, ETag/Last-Modified, content hash) and where the page was
+# written, so a restarted crawl skips finished pages and a re-crawl can
+# revalidate with a conditional GET instead of downloading everything again.
+
+JOURNAL_NAME = "crawl_journal.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    content_hash  TEXT,
+    out_path      TEXT,
+    fetched_at    REAL
+)
+"""
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class CrawlJournal:
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url: str):
+        row = self.db.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def record(self, url, status, etag="", last_modified="", content_hash="", out_path=""):
+        # commit per page: a crash loses at most the page in flight
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, status, etag or "", last_modified or "", content_hash, out_path, time.time()),
+        )
+        self.db.commit()
+
+    def touch(self, url):
+        # 304: page unchanged, only the fetch time moves
+        self.db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        self.db.commit()
+
+    def is_done(self, row, exists=os.path.exists) -> bool:
+        # fetched OK and, if it was saved, still there; `exists` checks out_path
+        # (a file path, or a page name when the crawler writes to an HtmlStore)
+        if not row or row["status"] != 200:
+            return False
+        return not row["out_path"] or exists(row["out_path"])
+
+    def max_seq(self) -> int:
+        # highest NNNNN_ prefix handed out so far, for collision-free file numbering
+        best = 0
+        for (path,) in self.db.execute("SELECT out_path FROM pages WHERE out_path != ''"):
+            m = re.match(r"(\d+)_", os.path.basename(path))
+            if m:
+                best = max(best, int(m.group(1)))
+        return best
+
+
+def conditional_headers(row) -> dict:
+    if not row:
+        return {}
+    headers = {}
+    if row.get("etag"):
+        headers["If-None-Match"] = row["etag"]
+    if row.get("last_modified"):
+        headers["If-Modified-Since"] = row["last_modified"]
+    return headers
+
+
+def read_cached(row) -> str:
+    with open(row["out_path"], "r", encoding="utf-8") as f:
+        return f.read()
@@ -1,13 +1,20 @@
-import os, re, time
-import requests
+import asyncio
+import os, re
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from crawl_engine import Fetcher
+from crawl_journal import JOURNAL_NAME, CrawlJournal, conditional_headers, content_hash, read_cached
+from html_store import STORE_NAME, HtmlStore
+
 OUT_DIR = "wiki_html_A"
 MIN_YEAR = 1990
 MAX_YEAR = 2020
 TARGET = 1000
-SLEEP = 1.5
+CONCURRENCY = 8
+RATE = 5.0  # requests/second to the host
+LISTS_DIR = "_lists"  # year list pages, kept for conditional re-fetches
+REVALIDATE = False    # True: conditional GET for pages the journal already has
 
 BASE = "https://en.wikipedia.org"
 HEADERS = {
@@ -15,21 +22,6 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-session = requests.Session()
-
-def get(url: str) -> str:
-    for attempt in range(3):
-        try:
-            r = session.get(url, headers=HEADERS, timeout=30)
-            if r.status_code == 429 or r.status_code >= 500:
-                time.sleep(3 + attempt * 2)
-                continue
-            r.raise_for_status()
-            return r.text
-        except Exception:
-            time.sleep(2 + attempt * 2)
-    raise RuntimeError(f"Failed after retries: {url}")
-
 def clean(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "")).strip()
 
@@ -72,64 +64,132 @@ def collect_movie_links(html: str):
             out.append(href)
     return out
 
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-
-    saved = 0
-    seen_slugs = set()
-
-    for year in range(MIN_YEAR, MAX_YEAR + 1):
-        if saved >= TARGET:
-            break
-
-        year_url = f"{BASE}/wiki/List_of_horror_films_of_{year}"
-        print(f"[YEAR] {year} -> {year_url}")
-
-        try:
-            html = get(year_url)
-        except Exception as e:
-            print("  !! failed year page:", e)
-            continue
-
-        year_links = collect_movie_links(html)
-        print(f"  found {len(year_links)} candidate links")
-
-        for idx, href in enumerate(year_links, 1):
-            if saved >= TARGET:
-                break
-
-            slug = slug_from_href(href)
-            if slug in seen_slugs:
-                continue
-            seen_slugs.add(slug)
-
-            movie_url = urljoin(BASE, href)
+def write_page(path: str, html: str):
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp, path)
 
-            try:
-                mhtml = get(movie_url)
-            except Exception as e:
-                # print occasional failures but keep going
-                if idx % 25 == 0:
-                    print(f"  .. skipped (fetch fail) {movie_url}")
-                continue
+def record_response(journal, url, status, html, headers, out_path):
+    journal.record(url, status, headers.get("ETag", ""), headers.get("Last-Modified", ""),
+                   content_hash(html), out_path)
 
-            if "class=\"infobox" not in mhtml:
-                continue
+async def fetch_list_page(fetcher, journal, url, out_path, revalidate):
+    row = journal.get(url)
+    if journal.is_done(row) and not revalidate:
+        return read_cached(row)
 
-            out_path = os.path.join(OUT_DIR, f"{saved+1:05d}_{year}_{slug}.html")
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(mhtml)
+    status, html, headers = await fetcher.fetch(url, conditional_headers(row) if journal.is_done(row) else None)
+    if status == 304:
+        journal.touch(url)
+        return read_cached(row)
+    write_page(out_path, html)
+    record_response(journal, url, status, html, headers, out_path)
+    return html
 
-            saved += 1
+async def crawl(base=BASE, out_dir=OUT_DIR, target=TARGET, revalidate=REVALIDATE):
+    os.makedirs(os.path.join(out_dir, LISTS_DIR), exist_ok=True)
 
-            if saved % 10 == 0:
-                print(f"  saved {saved}/{TARGET}")
-
-            time.sleep(SLEEP)
+    saved = 0
+    seen_slugs = set()
 
-        time.sleep(SLEEP)
+    # movie pages go into the compressed page store; the journal's out_path is
+    # the page name there
+    with CrawlJournal(os.path.join(out_dir, JOURNAL_NAME)) as journal, \
+            HtmlStore(os.path.join(out_dir, STORE_NAME)) as store:
+        in_store = store.__contains__
+        # new files continue after the highest number already handed out, so a
+        # resumed or re-ranged crawl never overwrites a different movie's file
+        next_seq = journal.max_seq() + 1
+
+        async with Fetcher(HEADERS, concurrency=CONCURRENCY, rate=RATE) as fetcher:
+            for year in range(MIN_YEAR, MAX_YEAR + 1):
+                if saved >= target:
+                    break
+
+                year_url = f"{base}/wiki/List_of_horror_films_of_{year}"
+                print(f"[YEAR] {year} -> {year_url}")
+
+                try:
+                    list_path = os.path.join(out_dir, LISTS_DIR, f"list_{year}.html")
+                    html = await fetch_list_page(fetcher, journal, year_url, list_path, revalidate)
+                except Exception as e:
+                    print("  !! failed year page:", e)
+                    continue
+
+                year_links = collect_movie_links(html)
+                print(f"  found {len(year_links)} candidate links")
+
+                todo = []
+                for href in year_links:
+                    slug = slug_from_href(href)
+                    if slug in seen_slugs:
+                        continue
+                    seen_slugs.add(slug)
+                    todo.append((slug, urljoin(base, href)))
+
+                # Fetch in batches no bigger than what's still needed, then save in
+                # link order so file numbering doesn't depend on which fetch finished first.
+                while todo and saved < target:
+                    batch_size = min(CONCURRENCY, target - saved)
+                    batch, todo = todo[:batch_size], todo[batch_size:]
+
+                    rows = [journal.get(url) for _, url in batch]
+                    need = [i for i, row in enumerate(rows) if revalidate or not journal.is_done(row, in_store)]
+                    fetched = await fetcher.fetch_many([
+                        (batch[i][1], conditional_headers(rows[i]) if journal.is_done(rows[i], in_store) else None)
+                        for i in need
+                    ])
+                    results = dict(zip(need, fetched))
+
+                    for i, (slug, movie_url) in enumerate(batch):
+                        if saved >= target:
+                            break
+                        row = rows[i]
+                        done = journal.is_done(row, in_store)
+
+                        if i not in results:
+                            # finished on an earlier run
+                            if row["out_path"]:
+                                saved += 1
+                            continue
+
+                        res = results[i]
+                        if res is None:
+                            print(f"  .. skipped (fetch fail) {movie_url}")
+                            continue
+
+                        status, mhtml, headers = res
+                        if status == 304:
+                            journal.touch(movie_url)
+                            if row["out_path"]:
+                                saved += 1
+                            continue
+
+                        if "class=\"infobox" not in mhtml:
+                            record_response(journal, movie_url, status, mhtml, headers, "")
+                            continue
+
+                        if done and row["out_path"]:
+                            out_path = row["out_path"]
+                        else:
+                            out_path = f"{next_seq:05d}_{year}_{slug}.html"
+                            next_seq += 1
+
+                        if not (done and row["content_hash"] == content_hash(mhtml)):
+                            store.put(out_path, mhtml, year)
+                        record_response(journal, movie_url, status, mhtml, headers, out_path)
+
+                        saved += 1
+
+                        if saved % 10 == 0:
+                            print(f"  saved {saved}/{target}")
+
+    print(f"Done. Saved {saved} HTML pages in {os.path.join(out_dir, STORE_NAME)}")
+    return saved
 
-    print(f"Done. Saved {saved} HTML pages in {OUT_DIR}/")
+def main():
+    asyncio.run(crawl())
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,9 @@ import os
 import time
 import requests
 
+from crawl_journal import JOURNAL_NAME, CrawlJournal, conditional_headers, content_hash
+from html_store import STORE_NAME, HtmlStore
+
 OUT_DIR = "wiki_html"
 
 # Adjust the range if you want more/less
@@ -16,25 +19,44 @@ HEADERS = {
 }
 
 DELAY_SECONDS = 1.2  # be polite
+REVALIDATE = False   # True: conditional GET for years the journal already has
 
-def main():
+def main(revalidate=REVALIDATE):
     os.makedirs(OUT_DIR, exist_ok=True)
     ok = 0
     fail = 0
+    cached = 0
+
+    journal = CrawlJournal(os.path.join(OUT_DIR, JOURNAL_NAME))
+    store = HtmlStore(os.path.join(OUT_DIR, STORE_NAME))
 
     for year in range(START_YEAR, END_YEAR + 1):
         url = BASE.format(year)
-        out_path = os.path.join(OUT_DIR, f"wiki_horror_{year}.html")
+        out_path = f"wiki_horror_{year}.html"  # page name in the store
+
+        row = journal.get(url)
+        done = journal.is_done(row, store.__contains__)
+        if done and not revalidate:
+            cached += 1
+            continue
 
         print(f"Downloading {year} -> {out_path}")
         try:
-            r = requests.get(url, headers=HEADERS, timeout=30)
-            if r.status_code == 200 and "<html" in r.text.lower():
-                with open(out_path, "w", encoding="utf-8") as f:
-                    f.write(r.text)
+            headers = dict(HEADERS, **conditional_headers(row)) if done else HEADERS
+            r = requests.get(url, headers=headers, timeout=30)
+            if r.status_code == 304:
+                journal.touch(url)
+                cached += 1
+            elif r.status_code == 200 and "<html" in r.text.lower():
+                h = content_hash(r.text)
+                if not (done and row["content_hash"] == h):
+                    store.put(out_path, r.text, year)
+                journal.record(url, 200, r.headers.get("ETag", ""),
+                               r.headers.get("Last-Modified", ""), h, out_path)
                 ok += 1
             else:
                 print(f"  !! Failed {year}: status={r.status_code}, bytes={len(r.text)}")
+                journal.record(url, r.status_code)
                 fail += 1
         except Exception as e:
             print(f"  !! Error {year}: {e}")
@@ -42,8 +64,11 @@ def main():
 
         time.sleep(DELAY_SECONDS)
 
-    print(f"\nDone. Success: {ok}, Failed: {fail}")
-    print(f"HTML saved to: {OUT_DIR}/")
+    journal.close()
+    store.close()
+
+    print(f"\nDone. Success: {ok}, Unchanged/cached: {cached}, Failed: {fail}")
+    print(f"HTML saved to: {os.path.join(OUT_DIR, STORE_NAME)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import sqlite3
+
+# Manifest for incremental extraction: per page name, the content hash it was
+# parsed from and the rows it produced. A page whose hash still matches is not
+# parsed again. `version` names the extractor and parser; when it changes, the
+# cached rows are dropped because they may no longer be what the code produces.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    rows TEXT NOT NULL
+);
+"""
+
+MISSING = object()  # get() result for a page that has to be parsed again
+
+
+def page_hash(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+
+class ExtractCache:
+    def __init__(self, path: str, version: str):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            self.db.execute("DELETE FROM pages")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        self.db.commit()
+        self.hits = 0    # cached results used (counted by extract_runner)
+        self.misses = 0  # pages parsed and stored
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, name: str, h: str):
+        # cached result for this exact content, or MISSING
+        row = self.db.execute("SELECT hash, rows FROM pages WHERE name = ?", (name,)).fetchone()
+        if row is None or row[0] != h:
+            return MISSING
+        return json.loads(row[1])
+
+    def put(self, name: str, h: str, result):
+        self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (name, h, json.dumps(result)))
+
+    def prune(self, names):
+        # forget pages that are gone from the crawl
+        keep = set(names)
+        stale = [n for (n,) in self.db.execute("SELECT name FROM pages") if n not in keep]
+        self.db.executemany("DELETE FROM pages WHERE name = ?", [(n,) for n in stale])
+        self.db.commit()
+        return len(stale)
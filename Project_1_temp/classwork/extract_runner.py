@@ -0,0 +1,106 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from extract_cache import MISSING, page_hash
+
+# Shared process-pool runner for the extractors. Pages go out in chunks, at most
+# `window` chunks are in flight at a time (so a big page store is never loaded
+# all at once), and results come back in input order, so any dedup the caller
+# does afterwards sees the same sequence as a serial run.
+
+WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 8
+
+
+def _run_chunk(fn, chunk):
+    return [fn(name, html) for name, html in chunk]
+
+
+def _chunks(pages, size):
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_extraction(pages, fn, workers=WORKERS, chunk_size=CHUNK_SIZE, window=None):
+    # pages: iterable of (name, html); fn(name, html) must be a module-level
+    # function (or functools.partial of one) so it can be pickled.
+    # Yields fn's results in input order.
+    if workers <= 1:
+        for name, html in pages:
+            yield fn(name, html)
+        return
+
+    window = window or workers * 4
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for chunk in _chunks(pages, chunk_size):
+            pending.append(ex.submit(_run_chunk, fn, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # also reached when the caller stops early (e.g. a row limit)
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def run_incremental(pages, fn, cache, workers=WORKERS, chunk_size=CHUNK_SIZE):
+    # Like run_extraction(), but pages whose content hash is in `cache` (an
+    # ExtractCache) are not parsed again; only new or changed pages go to the
+    # pool. Output order is still input order: cached results wait in `order`
+    # until every page before them has been yielded. cache.hits / cache.misses
+    # count cached results yielded and pages parsed.
+    order = deque()    # cached result, or MISSING for a page sent to the pool
+    pending = deque()  # (name, hash) of pages sent to the pool
+    names = []
+    stopped = False
+
+    def misses():
+        for name, html in pages:
+            if stopped:
+                return
+            names.append(name)
+            h = page_hash(html)
+            result = cache.get(name, h)
+            order.append(result)
+            if result is MISSING:
+                pending.append((name, h))
+                yield name, html
+
+    def store(result):
+        name, h = pending.popleft()
+        cache.put(name, h, result)
+        cache.misses += 1
+
+    results = run_extraction(misses(), fn, workers=workers, chunk_size=chunk_size)
+    try:
+        for result in results:
+            store(result)
+            while order[0] is not MISSING:
+                cache.hits += 1
+                yield order.popleft()
+            order.popleft()
+            yield result
+    except GeneratorExit:
+        # The caller stopped early (e.g. a row limit). Pages already read ahead
+        # are parsed or in flight: read no further pages, but keep those
+        # results so the next run does not parse them again.
+        stopped = True
+        for result in results:
+            store(result)
+        raise
+
+    while order:
+        cache.hits += 1
+        yield order.popleft()
+
+    # only reached when the caller read everything, so `names` is the full crawl
+    cache.prune(names)
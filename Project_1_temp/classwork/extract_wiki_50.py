@@ -1,29 +1,23 @@
-import csv
-import glob
 import os
 import re
-from bs4 import BeautifulSoup
+from functools import partial
 
-HTML_DIR = "wiki_html_A"
-OUT_CSV = "tableA.csv"
+from extract_cache import ExtractCache
+from extract_runner import WORKERS, run_extraction, run_incremental
+from html_store import iter_html
+from table_schema import write_table
+from wiki_parse import get_backend, page_fields
 
-FIELDS = ["ID","title","release_year","genre","director","runtime_minutes","imdb_rating","rotten_tomatoes_score"]
+HTML_DIR = "wiki_html_A"
+OUT_TABLE = "tableA.csv"  # .csv, .parquet or .feather (see table_schema.py)
+PARSER = "lxml"  # "lxml", "selectolax" or "bs4" (see wiki_parse.py)
+LABELS = ["Directed by", "Running time"]
 
-def clean(s):
-    return re.sub(r"\s+", " ", (s or "")).strip()
-
-def parse_infobox_value(soup: BeautifulSoup, label: str) -> str:
-    infobox = soup.select_one("table.infobox")
-    if not infobox:
-        return ""
-    for row in infobox.select("tr"):
-        th = row.select_one("th")
-        td = row.select_one("td")
-        if not th or not td:
-            continue
-        if clean(th.get_text(" ", strip=True)).lower() == label.lower():
-            return clean(td.get_text(" ", strip=True))
-    return ""
+# Incremental mode re-parses only new/changed pages and reuses cached rows for
+# the rest. Bump EXTRACT_VERSION when extract_page() changes what it returns.
+INCREMENTAL = True
+CACHE_NAME = "extract_cache.sqlite"
+EXTRACT_VERSION = 1
 
 def runtime_to_minutes(text: str) -> str:
     t = (text or "").lower()
@@ -42,58 +36,74 @@ def year_from_filename(filename: str) -> str:
     m = re.search(r"^\d+_(19\d{2}|20\d{2})_", filename)
     return m.group(1) if m else ""
 
-def main(limit=1000):
-    files = sorted(glob.glob(os.path.join(HTML_DIR, "*.html")))
-    if not files:
-        raise SystemExit(f"No HTML files found in {HTML_DIR}/")
+def extract_page(base: str, html: str, parser=PARSER):
+    # one row per film page (None without a title); runs in the worker processes
+    year = year_from_filename(base)
+
+    slug = base.replace(".html", "")
+    parts = slug.split("_", 2)
+    wiki_id = parts[2] if len(parts) == 3 else slug
+
+    title, info = page_fields(html, LABELS, get_backend(parser))
+    if not title:
+        return None
+
+    return {
+        "ID": wiki_id,
+        "title": title,
+        "release_year": year,
+        "genre": "Horror",
+        "director": info["Directed by"],
+        "runtime_minutes": runtime_to_minutes(info["Running time"]),
+        "imdb_rating": "",
+        "rotten_tomatoes_score": ""
+    }
+
+def main(limit=1000, parser=PARSER, workers=WORKERS, incremental=INCREMENTAL):
+    if not os.path.isdir(HTML_DIR):
+        raise SystemExit(f"No HTML pages found in {HTML_DIR}/")
 
     rows = []
     seen_ids = set()
-
-    for fp in files:
-        base = os.path.basename(fp)
-        year = year_from_filename(base)
-
-        slug = base.replace(".html", "")
-        parts = slug.split("_", 2)
-        wiki_id = parts[2] if len(parts) == 3 else slug
-
-        with open(fp, "r", encoding="utf-8", errors="ignore") as f:
-            soup = BeautifulSoup(f.read(), "lxml")
-
-        title_el = soup.select_one("h1#firstHeading")
-        title = clean(title_el.get_text()) if title_el else ""
-        if not title:
+    n_pages = 0
+
+    # results arrive in page order, so the dedup below matches a serial run
+    fn = partial(extract_page, parser=parser)
+    pages = iter_html(HTML_DIR)
+    cache = None
+    if incremental:
+        cache = ExtractCache(os.path.join(HTML_DIR, CACHE_NAME),
+                             f"extract_wiki_50:{parser}:{EXTRACT_VERSION}")
+        results = run_incremental(pages, fn, cache, workers=workers)
+    else:
+        results = run_extraction(pages, fn, workers=workers)
+
+    for row in results:
+        n_pages += 1
+        if row is None:
             continue
 
-        director = parse_infobox_value(soup, "Directed by")
-        runtime_raw = parse_infobox_value(soup, "Running time")
-        runtime_minutes = runtime_to_minutes(runtime_raw)
-
-        if wiki_id in seen_ids:
+        if row["ID"] in seen_ids:
             continue
-        seen_ids.add(wiki_id)
-
-        rows.append({
-            "ID": wiki_id,
-            "title": title,
-            "release_year": year,
-            "genre": "Horror",
-            "director": director,
-            "runtime_minutes": runtime_minutes,
-            "imdb_rating": "",
-            "rotten_tomatoes_score": ""
-        })
+        seen_ids.add(row["ID"])
+
+        rows.append(row)
 
         if len(rows) >= limit:
             break
+    # stops the pool; in incremental mode, pages already parsed ahead are cached
+    results.close()
+
+    if cache is not None:
+        print(f"Parsed {cache.misses} new/changed pages, reused {cache.hits} cached.")
+        cache.close()
+
+    if not n_pages:
+        raise SystemExit(f"No HTML pages found in {HTML_DIR}/")
 
-    with open(OUT_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS)
-        w.writeheader()
-        w.writerows(rows)
+    write_table(rows, OUT_TABLE)
 
-    print(f"Wrote {OUT_CSV} with {len(rows)} rows.")
+    print(f"Wrote {OUT_TABLE} with {len(rows)} rows.")
 
 if __name__ == "__main__":
     main(limit=1000)
@@ -1,102 +1,59 @@
 import os
 import re
-import csv
-from bs4 import BeautifulSoup
+from functools import partial
 
-WIKI_HTML_DIR = "wiki_html"
-OUT_CSV = "tableB.csv"
+from extract_cache import ExtractCache
+from extract_runner import WORKERS, run_extraction, run_incremental
+from html_store import iter_html
+from table_schema import write_table
+from wiki_parse import get_backend, wikitable_rows
 
-FIELDS = [
-    "ID",
-    "title",
-    "release_year",
-    "genre",
-    "director",
-    "runtime_minutes",
-    "imdb_rating",
-    "rotten_tomatoes_score",
-]
+WIKI_HTML_DIR = "wiki_html"
+OUT_TABLE = "tableB.csv"  # .csv, .parquet or .feather (see table_schema.py)
+PARSER = "lxml"  # "lxml", "selectolax" or "bs4" (see wiki_parse.py)
 
-def clean(text: str) -> str:
-    text = text or ""
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+# Incremental mode re-parses only new/changed pages and reuses cached rows for
+# the rest. Bump EXTRACT_VERSION when extract_rows_from_wiki_page() changes.
+INCREMENTAL = True
+CACHE_NAME = "extract_cache.sqlite"
+EXTRACT_VERSION = 1
 
 def infer_year_from_filename(filename: str) -> str:
     m = re.search(r"(\d{4})", filename)
     return m.group(1) if m else ""
 
-def extract_rows_from_wiki_page(html_path: str):
-    with open(html_path, "r", encoding="utf-8", errors="ignore") as f:
-        soup = BeautifulSoup(f.read(), "lxml")
+def extract_rows_from_wiki_page(filename: str, html: str, parser=PARSER):
+    year = infer_year_from_filename(filename)
 
-    year = infer_year_from_filename(os.path.basename(html_path))
-
-    rows = []
     # Wikipedia lists usually have one or more "wikitable" tables.
-    tables = soup.select("table.wikitable")
-    for tbl in tables:
-        # Get header names so we can locate "Film" and "Director" columns when present.
-        header_cells = tbl.select("tr th")
-        headers = [clean(th.get_text(" ", strip=True)).lower() for th in header_cells]
-
-        # Find likely indices (best-effort)
-        # Many pages have headers like Film / Director / Cast / Notes
-        title_idx = None
-        director_idx = None
-
-        # If headers were captured in the first row only, handle that below.
-        # We'll compute from the first row that actually contains <th>.
-        first_header_row = tbl.select_one("tr")
-        if first_header_row and first_header_row.select("th"):
-            hdrs = [clean(th.get_text(" ", strip=True)).lower() for th in first_header_row.select("th")]
-            for i, h in enumerate(hdrs):
-                if "film" in h or "title" in h:
-                    title_idx = i
-                if "director" in h:
-                    director_idx = i
-
-        # Now parse body rows
-        for tr in tbl.select("tr"):
-            tds = tr.select("td")
-            if not tds:
-                continue
-
-            # Title is usually the first td if we can't detect header
-            t_i = title_idx if title_idx is not None and title_idx < len(tds) else 0
-            d_i = director_idx if director_idx is not None and director_idx < len(tds) else None
-
-            title = clean(tds[t_i].get_text(" ", strip=True))
-            if not title:
-                continue
-
-            director = ""
-            if d_i is not None:
-                director = clean(tds[d_i].get_text(" ", strip=True))
-
-            rows.append({
-                "title": title,
-                "release_year": year,
-                "genre": "Horror",
-                "director": director,
-                "runtime_minutes": "",
-                "imdb_rating": "",
-                "rotten_tomatoes_score": "",
-            })
-
+    rows = []
+    for title, director in wikitable_rows(html, get_backend(parser)):
+        rows.append({
+            "title": title,
+            "release_year": year,
+            "genre": "Horror",
+            "director": director,
+            "runtime_minutes": "",
+            "imdb_rating": "",
+            "rotten_tomatoes_score": "",
+        })
     return rows
 
-def main():
-    html_files = sorted(
-        f for f in os.listdir(WIKI_HTML_DIR)
-        if f.lower().endswith(".html")
-    )
-
+def main(parser=PARSER, workers=WORKERS, incremental=INCREMENTAL):
+    # pages are parsed in a process pool; rows come back in page order, so
+    # the dedup and ID assignment below are the same as a serial run
     all_rows = []
-    for f in html_files:
-        path = os.path.join(WIKI_HTML_DIR, f)
-        page_rows = extract_rows_from_wiki_page(path)
-        all_rows.extend(page_rows)
+    fn = partial(extract_rows_from_wiki_page, parser=parser)
+    pages = iter_html(WIKI_HTML_DIR)
+    if incremental:
+        with ExtractCache(os.path.join(WIKI_HTML_DIR, CACHE_NAME),
+                          f"extract_wiki_horror:{parser}:{EXTRACT_VERSION}") as cache:
+            for page_rows in run_incremental(pages, fn, cache, workers=workers):
+                all_rows.extend(page_rows)
+        print(f"Parsed {cache.misses} new/changed pages, reused {cache.hits} cached.")
+    else:
+        for page_rows in run_extraction(pages, fn, workers=workers):
+            all_rows.extend(page_rows)
 
     # De-dupe by (title, year) so you get closer to 1000 unique tuples
     seen = set()
@@ -112,14 +69,10 @@ def main():
     for i, r in enumerate(deduped, start=1):
         r["ID"] = f"w{i:06d}"
 
-    # Write CSV
-    with open(OUT_CSV, "w", newline="", encoding="utf-8") as out:
-        w = csv.DictWriter(out, fieldnames=FIELDS)
-        w.writeheader()
-        for r in deduped:
-            w.writerow({k: r.get(k, "") for k in FIELDS})
+    # Write table
+    write_table(deduped, OUT_TABLE)
 
-    print(f"Saved {len(deduped)} rows to {OUT_CSV}")
+    print(f"Saved {len(deduped)} rows to {OUT_TABLE}")
 
     if len(deduped) < 1000:
         print("WARNING: < 1000 rows. Expand year range (e.g., 1950–2020) or add more wiki pages.")
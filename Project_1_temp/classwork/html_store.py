@@ -0,0 +1,173 @@
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zlib is always there
+    zstandard = None
+
+# Compressed, content-addressed page store: one SQLite file per crawl directory
+# instead of thousands of raw .html files. Page bodies are stored once per
+# content hash (zstd, or zlib without zstandard) and indexed by name and year;
+# a body no page points at any more is dropped. Names are the file names the
+# crawlers used before, e.g. "00001_1990_Some_Film.html" or
+# "wiki_horror_1970.html".
+
+STORE_NAME = "pages.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash  TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size  INTEGER NOT NULL,
+    data  BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    name TEXT PRIMARY KEY,
+    year INTEGER,
+    hash TEXT NOT NULL REFERENCES blobs(hash)
+);
+CREATE INDEX IF NOT EXISTS pages_year ON pages(year);
+CREATE INDEX IF NOT EXISTS pages_hash ON pages(hash);
+"""
+
+# the year slot of the crawlers' names; the sequence number in front can look
+# like a year too ("01950_1990_X.html")
+NAME_YEAR = re.compile(r"^\d+_(\d{4})_|^wiki_horror_(\d{4})\b")
+
+
+def year_from_name(name: str):
+    m = NAME_YEAR.match(name)
+    return int(m.group(1) or m.group(2)) if m else None
+
+
+def compress(raw: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 9)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Store has zstd pages but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class HtmlStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name) -> bool:
+        return self.db.execute("SELECT 1 FROM pages WHERE name = ?", (name,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def put(self, name: str, html: str, year=None, commit=True) -> str:
+        raw = html.encode("utf-8")
+        h = hashlib.sha1(raw).hexdigest()
+        if not self.db.execute("SELECT 1 FROM blobs WHERE hash = ?", (h,)).fetchone():
+            codec, data = compress(raw)
+            self.db.execute("INSERT INTO blobs VALUES (?, ?, ?, ?)", (h, codec, len(raw), data))
+        if year is None:
+            year = year_from_name(name)
+        old = self.db.execute("SELECT hash FROM pages WHERE name = ?", (name,)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (name, year, h))
+        if old and old[0] != h:
+            self.drop_unused(old[0])
+        if commit:
+            self.db.commit()
+        return h
+
+    def drop_unused(self, h: str):
+        # the page's previous body, unless another page still shares it
+        self.db.execute("DELETE FROM blobs WHERE hash = ? AND NOT EXISTS "
+                        "(SELECT 1 FROM pages WHERE hash = ?)", (h, h))
+
+    def prune(self) -> int:
+        # bodies no page references (left by stores written before put()
+        # dropped replaced ones); returns how many were deleted
+        n = self.db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM pages)").rowcount
+        self.db.commit()
+        return n
+
+    def get(self, name: str) -> str:
+        row = self.db.execute(
+            "SELECT b.codec, b.data FROM pages p JOIN blobs b ON b.hash = p.hash WHERE p.name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return decompress(row[0], row[1]).decode("utf-8", errors="ignore")
+
+    def names(self, year=None):
+        sql, args = "SELECT name FROM pages", ()
+        if year is not None:
+            sql, args = sql + " WHERE year = ?", (year,)
+        return [r[0] for r in self.db.execute(sql + " ORDER BY name", args)]
+
+    def iter_pages(self, year=None):
+        # (name, html) in name order, one page decompressed at a time
+        sql = ("SELECT p.name, b.codec, b.data FROM pages p JOIN blobs b ON b.hash = p.hash")
+        args = ()
+        if year is not None:
+            sql, args = sql + " WHERE p.year = ?", (year,)
+        for name, codec, data in self.db.execute(sql + " ORDER BY p.name", args):
+            yield name, decompress(codec, data).decode("utf-8", errors="ignore")
+
+    def import_dir(self, html_dir: str, pattern="*.html") -> int:
+        n = 0
+        for fp in sorted(glob.glob(os.path.join(html_dir, pattern))):
+            with open(fp, "r", encoding="utf-8", errors="ignore") as f:
+                self.put(os.path.basename(fp), f.read(), commit=False)
+            n += 1
+        self.db.commit()
+        return n
+
+
+def iter_html(html_dir: str, pattern="*.html"):
+    # (file name, html) for a crawl directory: from its page store when there
+    # is one, otherwise from the loose .html files
+    store_path = os.path.join(html_dir, STORE_NAME)
+    if os.path.exists(store_path):
+        with HtmlStore(store_path) as store:
+            yield from store.iter_pages()
+        return
+    for fp in sorted(glob.glob(os.path.join(html_dir, pattern))):
+        with open(fp, "r", encoding="utf-8", errors="ignore") as f:
+            yield os.path.basename(fp), f.read()
+
+
+def main():
+    # python html_store.py wiki_html  -> packs wiki_html/*.html into wiki_html/pages.sqlite
+    html_dir = sys.argv[1] if len(sys.argv) > 1 else "wiki_html"
+    with HtmlStore(os.path.join(html_dir, STORE_NAME)) as store:
+        n = store.import_dir(html_dir)
+        print(f"Packed {n} pages into {store.path} ({len(store)} pages total)")
+        dropped = store.prune()
+        if dropped:
+            print(f"Dropped {dropped} page bodies no page references")
+    print(f"Store size: {os.path.getsize(os.path.join(html_dir, STORE_NAME)) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
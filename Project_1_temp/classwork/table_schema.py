@@ -0,0 +1,141 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV still works without pyarrow
+    pa = pq = None
+
+# Shared schema for tableA/tableB. Every stage writes and reads the eight FIELDS
+# through write_table()/read_table(); the file extension picks the format.
+# Parquet and Feather keep the dtypes below, so readers get typed columns with
+# no inference or string parsing. CSV stays the plain text it always was and is
+# coerced to the same dtypes when read. It lives next to the classwork writers
+# that import it directly; the root-level readers import it as
+# Project_1_temp.classwork.table_schema.
+
+FIELDS = [
+    "ID",
+    "title",
+    "release_year",
+    "genre",
+    "director",
+    "runtime_minutes",
+    "imdb_rating",
+    "rotten_tomatoes_score",
+]
+
+DTYPES = {
+    "ID": "string",
+    "title": "string",
+    "release_year": "Int16",
+    "genre": "category",
+    "director": "string",
+    "runtime_minutes": "Int16",
+    "imdb_rating": "float32",
+    "rotten_tomatoes_score": "float32",
+}
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+CHUNK_ROWS = 100_000
+
+
+def table_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unknown table format: {path} (use {', '.join(FORMATS)})")
+    if FORMATS[ext] != "csv" and pq is None:
+        raise RuntimeError(f"{FORMATS[ext]} output requested but pyarrow is not installed")
+    return FORMATS[ext]
+
+
+def coerce(df: pd.DataFrame) -> pd.DataFrame:
+    # FIELDS columns (missing ones added) in their schema dtypes; blanks become NA
+    out = {}
+    for col in FIELDS:
+        s = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index)
+        dtype = DTYPES[col]
+        if dtype in ("string", "category"):
+            s = s.astype("string")
+            s = s.mask(s.str.strip() == "")
+            # categories as plain str, the way Parquet/Feather hand them back
+            s = s.astype(object).astype(dtype) if dtype == "category" else s
+        else:
+            s = pd.to_numeric(s, errors="coerce")
+            if dtype.startswith("Int"):
+                # round fractional values (runtime "90.5") and NA out what the
+                # integer type cannot hold, rather than failing the cast
+                info = np.iinfo(dtype.lower())
+                s = s.round().where(lambda v: v.between(info.min, info.max))
+            s = s.astype(dtype)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def feather_reader(path: str):
+    # Feather (v2) is the Arrow IPC file format: schema and record batches can
+    # be read off a memory map without loading the table
+    return pa.ipc.open_file(pa.memory_map(path))
+
+
+def table_columns(path: str) -> list:
+    fmt = table_format(path)
+    if fmt == "parquet":
+        return pq.ParquetFile(path).schema_arrow.names
+    if fmt == "feather":
+        return feather_reader(path).schema.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(path: str, columns=None) -> pd.DataFrame:
+    fmt = table_format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    df = coerce(pd.read_csv(path, dtype=str))
+    return df[columns] if columns is not None else df
+
+
+def iter_table(path: str, columns=None, chunksize=CHUNK_ROWS):
+    # typed DataFrame chunks; Parquet and Feather are read batch by batch
+    fmt = table_format(path)
+    if fmt == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "feather":
+        reader = feather_reader(path)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield pa.Table.from_batches([batch.slice(start, chunksize)]).to_pandas()
+    else:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            chunk = coerce(chunk)
+            yield chunk[columns] if columns is not None else chunk
+
+
+def write_table(data, path: str):
+    # data: a DataFrame or a list of row dicts keyed by FIELDS
+    fmt = table_format(path)
+    if fmt == "csv":
+        if isinstance(data, pd.DataFrame):
+            data.to_csv(path, index=False)
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(data)
+        return
+
+    df = coerce(data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data), columns=FIELDS))
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
@@ -0,0 +1,177 @@
+import re
+
+import lxml.html
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:  # optional backend
+    SelectolaxParser = None
+
+# Fast-path HTML extraction for the wiki extractors. Each backend parses a page
+# once and exposes the four operations the extractors need (parse, first, all,
+# text); page_fields() and wikitable_rows() are written against that so the
+# parser can be swapped. "lxml" is the default, "bs4" is the old BeautifulSoup
+# path, "selectolax" is used when installed.
+
+# BeautifulSoup's get_text() leaves out the contents of these tags; the other
+# backends do the same so every backend produces the same rows.
+SKIP_TAGS = {"script", "style", "template"}
+
+
+def clean(s):
+    return re.sub(r"\s+", " ", (s or "")).strip()
+
+
+def has_class(cls_attr, cls):
+    return cls in (cls_attr or "").split()
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def parse(self, html):
+        return lxml.html.document_fromstring(html)
+
+    def first(self, node, tag, cls=None, id=None):
+        return next(self._iter(node, tag, cls, id), None)
+
+    def all(self, node, tag, cls=None):
+        return list(self._iter(node, tag, cls))
+
+    def _iter(self, node, tag, cls=None, id=None):
+        for el in node.iterdescendants(tag):
+            if cls and not has_class(el.get("class"), cls):
+                continue
+            if id and el.get("id") != id:
+                continue
+            yield el
+
+    def _strings(self, el):
+        if el.text:
+            yield el.text
+        for child in el:
+            # comments/PIs have a non-str tag; their text is skipped, tails kept
+            if isinstance(child.tag, str) and child.tag not in SKIP_TAGS:
+                yield from self._strings(child)
+            if child.tail:
+                yield child.tail
+
+    def text(self, node, sep="", strip=False):
+        if strip:
+            return sep.join(s.strip() for s in self._strings(node) if s.strip())
+        return sep.join(self._strings(node))
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def parse(self, html):
+        tree = SelectolaxParser(html)
+        tree.strip_tags(list(SKIP_TAGS))
+        return tree
+
+    def first(self, node, tag, cls=None, id=None):
+        return node.css_first(self._selector(tag, cls, id))
+
+    def all(self, node, tag, cls=None):
+        return node.css(self._selector(tag, cls))
+
+    def _selector(self, tag, cls=None, id=None):
+        return tag + (f".{cls}" if cls else "") + (f"#{id}" if id else "")
+
+    def text(self, node, sep="", strip=False):
+        return node.text(deep=True, separator=sep, strip=strip)
+
+
+class Bs4Backend:
+    name = "bs4"
+
+    def parse(self, html):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, "lxml")
+
+    def first(self, node, tag, cls=None, id=None):
+        return node.select_one(tag + (f".{cls}" if cls else "") + (f"#{id}" if id else ""))
+
+    def all(self, node, tag, cls=None):
+        return node.select(tag + (f".{cls}" if cls else ""))
+
+    def text(self, node, sep="", strip=False):
+        return node.get_text(sep, strip=strip)
+
+
+BACKENDS = {"lxml": LxmlBackend, "selectolax": SelectolaxBackend, "bs4": Bs4Backend}
+
+
+def get_backend(name="lxml"):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name == "selectolax" and SelectolaxParser is None:
+        raise RuntimeError("selectolax backend requested but selectolax is not installed")
+    return BACKENDS[name]()
+
+
+def infobox_values(be, doc, labels):
+    # One walk over the infobox rows for all labels; first matching row wins.
+    out = {label: "" for label in labels}
+    want = {label.lower(): label for label in labels}
+    infobox = be.first(doc, "table", cls="infobox")
+    if infobox is None:
+        return out
+
+    found = set()
+    for row in be.all(infobox, "tr"):
+        th = be.first(row, "th")
+        td = be.first(row, "td")
+        if th is None or td is None:
+            continue
+        key = clean(be.text(th, " ", strip=True)).lower()
+        if key in want and key not in found:
+            out[want[key]] = clean(be.text(td, " ", strip=True))
+            found.add(key)
+            if len(found) == len(want):
+                break
+    return out
+
+
+def page_fields(html, labels, be):
+    # (page title, {label: infobox value}) for a single film page
+    doc = be.parse(html)
+    title_el = be.first(doc, "h1", id="firstHeading")
+    title = clean(be.text(title_el)) if title_el is not None else ""
+    return title, infobox_values(be, doc, labels)
+
+
+def wikitable_rows(html, be):
+    # (title, director) per body row of every table.wikitable on a list page
+    doc = be.parse(html)
+    rows = []
+    for tbl in be.all(doc, "table", cls="wikitable"):
+        # Locate the "Film"/"Director" columns from the first row that has <th>.
+        title_idx = None
+        director_idx = None
+        first_header_row = be.first(tbl, "tr")
+        if first_header_row is not None:
+            for i, th in enumerate(be.all(first_header_row, "th")):
+                h = clean(be.text(th, " ", strip=True)).lower()
+                if "film" in h or "title" in h:
+                    title_idx = i
+                if "director" in h:
+                    director_idx = i
+
+        for tr in be.all(tbl, "tr"):
+            tds = be.all(tr, "td")
+            if not tds:
+                continue
+
+            # Title is usually the first td if we can't detect header
+            t_i = title_idx if title_idx is not None and title_idx < len(tds) else 0
+            d_i = director_idx if director_idx is not None and director_idx < len(tds) else None
+
+            title = clean(be.text(tds[t_i], " ", strip=True))
+            if not title:
+                continue
+
+            director = clean(be.text(tds[d_i], " ", strip=True)) if d_i is not None else ""
+            rows.append((title, director))
+    return rows
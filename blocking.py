@@ -0,0 +1,223 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Blocking layer for table matching: group B once, then score each block in one batch.
+
+STOPWORDS = {"the", "a", "an", "of", "and", "film"}
+
+
+def normalize(s) -> str:
+    if s is None or s is pd.NA or (isinstance(s, float) and np.isnan(s)):
+        return ""
+    s = str(s).lower()
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    return s.strip()
+
+
+def tokens(s) -> set:
+    return {t for t in normalize(s).split() if t not in STOPWORDS and len(t) > 1}
+
+
+def qgrams(s, q=3) -> set:
+    s = normalize(s).replace(" ", "")
+    if not s:
+        return set()
+    if len(s) <= q:
+        return {s}
+    return {s[i:i + q] for i in range(len(s) - q + 1)}
+
+
+def row_years(df: pd.DataFrame, col="release_year") -> np.ndarray:
+    # float64 year per row, NaN where missing or unparseable
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def year_blocks(df: pd.DataFrame, col="release_year") -> dict:
+    # year -> positional row indices (rows without a year are left out)
+    years = row_years(df, col)
+    keep = ~np.isnan(years)
+    pos = np.arange(len(df))[keep]
+    years = years[keep].astype(np.int64)
+    order = np.argsort(years, kind="stable")
+    years, pos = years[order], pos[order]
+    uniq, starts = np.unique(years, return_index=True)
+    return {int(y): block for y, block in zip(uniq, np.split(pos, starts[1:]))}
+
+
+def row_keys(df: pd.DataFrame, cols, key_fn=tokens) -> list:
+    # one key set per row, union over the given columns
+    out = []
+    for values in zip(*(df[c].to_numpy() for c in cols)):
+        keys = set()
+        for v in values:
+            keys |= key_fn(v)
+        out.append(keys)
+    return out
+
+
+def key_index(keys: list, positions) -> dict:
+    # inverted index key -> positional row indices, restricted to `positions`
+    idx = defaultdict(list)
+    for p in positions:
+        for k in keys[p]:
+            idx[k].append(p)
+    return {k: np.asarray(v, dtype=np.int64) for k, v in idx.items()}
+
+
+def candidate_blocks(A: pd.DataFrame, B: pd.DataFrame, year_col="release_year", window=0,
+                     left_cols=None, right_cols=None, key_fn=tokens, max_key_size=None,
+                     keys=None):
+    # Yields (a_pos, b_pos) pairs of positional index arrays. Every A row in a_pos is
+    # a candidate for every B row in b_pos. Blocks may overlap when key blocking is on;
+    # merge_pairs() drops the duplicate pairs after scoring. keys=(a_keys, b_keys)
+    # supplies precomputed per-row key sets (norm_index.row_sets) instead of
+    # left/right_cols.
+    a_years = year_blocks(A, year_col)
+    b_years = year_blocks(B, year_col)
+
+    a_keys = b_keys = None
+    if keys is not None:
+        a_keys, b_keys = keys
+    elif left_cols:
+        a_keys = row_keys(A, left_cols, key_fn)
+        b_keys = row_keys(B, right_cols or left_cols, key_fn)
+
+    for y, a_pos in sorted(a_years.items()):
+        parts = [b_years[y + d] for d in range(-window, window + 1) if y + d in b_years]
+        if not parts:
+            continue
+        b_pos = np.sort(np.concatenate(parts))
+
+        if a_keys is None:
+            yield a_pos, b_pos
+            continue
+
+        a_idx = key_index(a_keys, a_pos)
+        b_idx = key_index(b_keys, b_pos)
+        for k in sorted(a_idx.keys() & b_idx.keys()):
+            if max_key_size and len(b_idx[k]) > max_key_size:
+                continue
+            yield a_idx[k], b_idx[k]
+
+
+def as_strings(series: pd.Series) -> np.ndarray:
+    # same text the old per-row str(a[col]) produced, NaN included (typed
+    # tables hold pd.NA instead, which reads the same way)
+    return np.array(["nan" if v is pd.NA else str(v) for v in series.to_numpy()], dtype=object)
+
+
+def merge_pairs(out_a, out_b, out_s):
+    # per-block (a_pos, b_pos, score) arrays -> one set sorted by A row, then B
+    # row, with pairs from overlapping blocks kept once
+    if not out_a:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+    a = np.concatenate(out_a)
+    b = np.concatenate(out_b)
+    s = np.concatenate(out_s)
+    order = np.lexsort((b, a))
+    a, b, s = a[order], b[order], s[order]
+    if len(a):
+        keep = np.ones(len(a), dtype=bool)
+        keep[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+        a, b, s = a[keep], b[keep], s[keep]
+    return a, b, s
+
+
+# ---------------- MINHASH / LSH ----------------
+# Approximate candidate generation that ignores years: each row's shingle set
+# (e.g. norm_index q-grams) gets a MinHash signature of bands * rows values,
+# and two rows become candidates when all `rows` values of at least one band
+# agree. Rows with Jaccard similarity s collide with probability
+# 1 - (1 - s^rows)^bands, so the cut-off sits near (1/bands)^(1/rows).
+# Each shared bucket is yielded as one block, like candidate_blocks(); a pair
+# sharing several bands shows up in several buckets, so run the buckets
+# through pair_blocks() before scoring.
+LSH_PRIME = (1 << 31) - 1
+LSH_CHUNK = 20000  # rows hashed per step; bounds the (shingles x perms) matrix
+
+
+def minhash_signatures(shingle_sets, num_perm, seed=0):
+    # (signatures uint64 (n, num_perm), has_shingles bool (n,)); same seed ->
+    # same permutations, so both tables must be hashed with the same seed
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, LSH_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, LSH_PRIME, num_perm, dtype=np.uint64)
+
+    n = len(shingle_sets)
+    sig = np.full((n, num_perm), LSH_PRIME, dtype=np.uint64)
+    lens = np.fromiter((len(s) for s in shingle_sets), dtype=np.int64, count=n)
+    for start in range(0, n, LSH_CHUNK):
+        stop = min(start + LSH_CHUNK, n)
+        rows = np.flatnonzero(lens[start:stop]) + start
+        if len(rows) == 0:
+            continue
+        flat = np.array([g for i in rows for g in shingle_sets[i]], dtype=object)
+        h = pd.util.hash_array(flat) % np.uint64(LSH_PRIME)
+        perm = (h[:, None] * a + b) % np.uint64(LSH_PRIME)
+        starts = np.concatenate(([0], np.cumsum(lens[rows])[:-1]))
+        sig[rows] = np.minimum.reduceat(perm, starts, axis=0)
+    return sig, lens > 0
+
+
+def band_buckets(sig, ok, band, rows) -> dict:
+    # bucket hash -> positional rows for one band (rows without shingles left out)
+    pos = np.flatnonzero(ok)
+    keys = pd.util.hash_pandas_object(pd.DataFrame(sig[pos, band * rows:(band + 1) * rows]),
+                                      index=False).to_numpy()
+    order = np.argsort(keys, kind="stable")
+    keys, pos = keys[order], pos[order]
+    uniq, starts = np.unique(keys, return_index=True)
+    return dict(zip(uniq.tolist(), np.split(pos, starts[1:])))
+
+
+def lsh_blocks(a_sets, b_sets, bands=20, rows=4, seed=0, max_bucket=None):
+    # Yields (a_pos, b_pos) for every band bucket both tables hit. Buckets with
+    # more than max_bucket B rows (very common shingle sets) are skipped.
+    a_sig, a_ok = minhash_signatures(a_sets, bands * rows, seed)
+    b_sig, b_ok = minhash_signatures(b_sets, bands * rows, seed)
+    for band in range(bands):
+        a_buckets = band_buckets(a_sig, a_ok, band, rows)
+        b_buckets = band_buckets(b_sig, b_ok, band, rows)
+        for k in sorted(a_buckets.keys() & b_buckets.keys()):
+            if max_bucket and len(b_buckets[k]) > max_bucket:
+                continue
+            yield a_buckets[k], b_buckets[k]
+
+
+def within_years(blocks, A: pd.DataFrame, B: pd.DataFrame, year_col="release_year", window=0):
+    # Narrows year-blind blocks (lsh_blocks) to pairs at most `window` years
+    # apart: each block is split by A year and paired with the B rows in range.
+    # Rows without a year drop out, as they do in candidate_blocks().
+    a_years = row_years(A, year_col)
+    b_years = row_years(B, year_col)
+    for a_pos, b_pos in blocks:
+        ay, by = a_years[a_pos], b_years[b_pos]
+        for y in np.unique(ay[~np.isnan(ay)]):
+            b_in = b_pos[np.abs(by - y) <= window]
+            if len(b_in):
+                yield a_pos[ay == y], b_in
+
+
+def pair_ids(blocks, n_right) -> np.ndarray:
+    # sorted distinct a_pos * n_right + b_pos ids of the pairs the blocks cover
+    if not blocks:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate([(a[:, None] * n_right + b[None, :]).ravel() for a, b in blocks]))
+
+
+def pair_blocks(blocks, n_right):
+    # Collapses overlapping blocks (one per LSH band bucket) into one block per
+    # A row holding its distinct B rows, so each candidate pair is scored once
+    # instead of once per band it shares.
+    a, b = np.divmod(pair_ids(list(blocks), n_right), n_right)
+    rows, starts = np.unique(a, return_index=True)
+    for row, b_pos in zip(rows, np.split(b, starts[1:])):
+        yield np.array([row]), b_pos
+
+
+def distinct_pairs(blocks, n_right) -> int:
+    # candidate pairs the blocks cover, each (a, b) counted once
+    return int(len(pair_ids(blocks, n_right)))
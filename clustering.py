@@ -0,0 +1,367 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized clustering engines used by project6.py.
+
+ASSIGN_CHUNK = 65536  # rows per distance block, keeps the n x K matrix bounded
+
+
+# ---------------- K-MEANS ----------------
+def squared_distances(X, C, x_sq=None):
+    # ||x||^2 - 2 x.c + ||c||^2 for every row of X against every centroid
+    if x_sq is None:
+        x_sq = np.einsum("ij,ij->i", X, X)
+    c_sq = np.einsum("ij,ij->i", C, C)
+    d = x_sq[:, None] - 2.0 * (X @ C.T) + c_sq[None, :]
+    return np.maximum(d, 0.0, out=d)  # rounding can leave tiny negatives
+
+
+def assign(X, C, x_sq=None, chunk=ASSIGN_CHUNK):
+    # nearest centroid and its squared distance, chunked over rows
+    n = len(X)
+    labels = np.empty(n, dtype=np.int64)
+    dist = np.empty(n, dtype=np.float64)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        d = squared_distances(X[start:stop], C, None if x_sq is None else x_sq[start:stop])
+        labels[start:stop] = np.argmin(d, axis=1)
+        dist[start:stop] = d[np.arange(stop - start), labels[start:stop]]
+    return labels, dist
+
+
+def kmeans_plus_plus(X, K, rng, x_sq=None):
+    # k-means++ seeding: each new centroid is drawn with probability ~ D(x)^2
+    n = len(X)
+    centroids = np.empty((K, X.shape[1]), dtype=np.float64)
+    centroids[0] = X[rng.integers(n)]
+    closest = squared_distances(X, centroids[:1], x_sq)[:, 0]
+    for k in range(1, K):
+        total = closest.sum()
+        if total <= 0:  # fewer distinct points than K
+            idx = rng.integers(n)
+        else:
+            idx = np.searchsorted(np.cumsum(closest), rng.random() * total)
+            idx = min(idx, n - 1)
+        centroids[k] = X[idx]
+        closest = np.minimum(closest, squared_distances(X, centroids[k:k + 1], x_sq)[:, 0])
+    return centroids
+
+
+def update_centroids(X, labels, K, old):
+    # per-cluster means via bincount; an empty cluster keeps its old centroid
+    counts = np.bincount(labels, minlength=K)
+    sums = np.stack([np.bincount(labels, weights=X[:, j], minlength=K)
+                     for j in range(X.shape[1])], axis=1)
+    new = old.copy()
+    nonempty = counts > 0
+    new[nonempty] = sums[nonempty] / counts[nonempty, None]
+    return new
+
+
+def kmeans(X, K=4, max_iters=100, init="k-means++", seed=None):
+    # Returns (labels, centroids): labels is an int array of cluster indices
+    # per row, centroids a K x n_features array.
+    X = np.asarray(X, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    x_sq = np.einsum("ij,ij->i", X, X)
+
+    if init == "k-means++":
+        centroids = kmeans_plus_plus(X, K, rng, x_sq)
+    elif init == "random":
+        centroids = X[rng.choice(len(X), K, replace=False)].copy()
+    else:
+        raise ValueError(f"Unknown init: {init}")
+
+    labels, _ = assign(X, centroids, x_sq)
+    for _ in range(max_iters):
+        new_centroids = update_centroids(X, labels, K, centroids)
+
+        # Stop if centroids do not change
+        if np.allclose(centroids, new_centroids):
+            break
+
+        centroids = new_centroids
+        labels, _ = assign(X, centroids, x_sq)
+
+    return labels, centroids
+
+
+# ---------------- OUT-OF-CORE INPUT ----------------
+# A batch source is a zero-argument callable that returns a fresh iterator of
+# 2-D float arrays, so it can be replayed once per pass/epoch without ever
+# holding the whole dataset in memory.
+BATCH_SIZE = 10000
+
+
+def csv_batches(path, batch_size=BATCH_SIZE, skip_cols=1):
+    # numeric columns of a CSV, read in chunks (skip_cols drops leading label columns)
+    def source():
+        for chunk in pd.read_csv(path, chunksize=batch_size):
+            yield chunk.iloc[:, skip_cols:].to_numpy(dtype=np.float64)
+    return source
+
+
+def npy_batches(path, batch_size=BATCH_SIZE):
+    # row slices of a memory-mapped .npy file
+    def source():
+        X = np.load(path, mmap_mode="r")
+        for start in range(0, len(X), batch_size):
+            yield np.asarray(X[start:start + batch_size], dtype=np.float64)
+    return source
+
+
+def streaming_stats(source):
+    # column mean and population std (np.std's default) in one pass, merging
+    # per-batch (count, mean, M2) with Chan et al.'s parallel update
+    n, mean, m2 = 0, None, None
+    for B in source():
+        nb = len(B)
+        if nb == 0:
+            continue
+        mb = B.mean(axis=0)
+        m2b = ((B - mb) ** 2).sum(axis=0)
+        if mean is None:
+            n, mean, m2 = nb, mb, m2b
+            continue
+        delta = mb - mean
+        total = n + nb
+        mean = mean + delta * nb / total
+        m2 = m2 + m2b + delta ** 2 * n * nb / total
+        n = total
+    if mean is None:
+        raise ValueError("No rows in input")
+    return mean, np.sqrt(m2 / n), n
+
+
+def standardized(source, mean, std):
+    std = np.where(std > 0, std, 1.0)
+
+    def stand():
+        for B in source():
+            yield (B - mean) / std
+    return stand
+
+
+# ---------------- MINI-BATCH K-MEANS ----------------
+def minibatch_kmeans(source, K=4, epochs=10, tol=1e-4, seed=None, verbose=True):
+    # Mini-batch k-means (Sculley 2010) over a batch source. Each centroid moves
+    # towards the mean of its points in the batch with step 1/(points seen so
+    # far). Returns (centroids, history) where history has one
+    # (epoch, mean squared distance, max centroid shift) per epoch; training
+    # stops once the shift drops below tol.
+    rng = np.random.default_rng(seed)
+    centroids = None
+    counts = np.zeros(K, dtype=np.float64)
+    history = []
+
+    for epoch in range(1, epochs + 1):
+        start = None
+        sq_total, n_total = 0.0, 0
+        for B in source():
+            if len(B) == 0:
+                continue
+            if centroids is None:
+                if len(B) < K:
+                    raise ValueError("First batch is smaller than K")
+                centroids = kmeans_plus_plus(B, K, rng)
+            if start is None:
+                start = centroids.copy()
+
+            labels, dist = assign(B, centroids)
+            sq_total += dist.sum()
+            n_total += len(B)
+
+            n_k = np.bincount(labels, minlength=K).astype(np.float64)
+            sums = np.stack([np.bincount(labels, weights=B[:, j], minlength=K)
+                             for j in range(B.shape[1])], axis=1)
+            hit = n_k > 0
+            counts[hit] += n_k[hit]
+            centroids[hit] += (sums[hit] - n_k[hit, None] * centroids[hit]) / counts[hit, None]
+
+        if centroids is None:
+            raise ValueError("No rows in input")
+        shift = float(np.sqrt(((centroids - start) ** 2).sum(axis=1)).max())
+        inertia = sq_total / max(n_total, 1)
+        history.append((epoch, inertia, shift))
+        if verbose:
+            print(f"epoch {epoch}: mean sq. distance {inertia:.6f}, max centroid shift {shift:.6f}")
+        if shift < tol:
+            break
+
+    return centroids, history
+
+
+def predict(source, centroids):
+    # labels for every row of a batch source, one batch at a time
+    for B in source():
+        yield assign(B, centroids)[0]
+
+
+# ---------------- HIERARCHICAL ----------------
+# Agglomerative clustering on a distance matrix computed once. Merges are found
+# with the nearest-neighbor chain algorithm and the merged cluster's distances
+# come from the Lance-Williams update, so each merge is O(n) NumPy work and the
+# whole run is O(n^2) instead of re-measuring every point pair per merge.
+LINKAGES = ("min", "max", "average")
+
+
+def pairwise_condensed(X, dtype=np.float64, out=None):
+    # upper triangle of the Euclidean distance matrix, row by row (like scipy's pdist)
+    # (direct differences rather than the expansion trick, for exact distances)
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    if out is None:
+        out = np.empty(n * (n - 1) // 2, dtype=dtype)
+    pos = 0
+    for i in range(n - 1):
+        diff = X[i + 1:] - X[i]
+        out[pos:pos + n - i - 1] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        pos += n - i - 1
+    return out
+
+
+def condensed_index(a, n):
+    # positions of d(a, j), j = 0..n-1, in a condensed vector (entry a is junk)
+    j = np.arange(n)
+    lo, hi = np.minimum(a, j), np.maximum(a, j)
+    return n * lo - lo * (lo + 1) // 2 + (hi - lo - 1)
+
+
+def nn_chain(d, n, method="min"):
+    # d: condensed working copy of the distances (overwritten; dead pairs become
+    # inf). Row a of the n x n matrix is gathered through condensed_index(), so
+    # memory stays at one condensed vector. Returns unsorted merges as
+    # (slot_a, slot_b, distance) where the merged cluster takes slot_a.
+    if method not in LINKAGES:
+        raise ValueError(f"Unknown linkage: {method}")
+    size = np.ones(n, dtype=np.float64)
+    active = np.ones(n, dtype=bool)
+    merges = []
+    chain = []
+
+    def row(a):
+        r = d[condensed_index(a, n)]
+        r[a] = np.inf
+        return r
+
+    for _ in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        while True:
+            a = chain[-1]
+            ra = row(a)
+            b = int(np.argmin(ra))
+            # on a tie, prefer the previous chain element so the chain terminates
+            if len(chain) > 1 and ra[chain[-2]] <= ra[b]:
+                b = chain[-2]
+                break
+            chain.append(b)
+        chain.pop()
+        chain.pop()
+
+        a, b = min(a, b), max(a, b)
+        ra, rb = row(a), row(b)
+        merges.append((a, b, float(ra[b])))
+
+        # Lance-Williams update of the merged cluster's row
+        if method == "min":
+            new = np.minimum(ra, rb)
+        elif method == "max":
+            new = np.maximum(ra, rb)
+        else:
+            new = (size[a] * ra + size[b] * rb) / (size[a] + size[b])
+        new[~active] = np.inf
+        new[b] = np.inf
+        others = np.arange(n) != a
+        d[condensed_index(a, n)[others]] = new[others]
+        others = np.arange(n) != b
+        d[condensed_index(b, n)[others]] = np.inf
+        active[b] = False
+        size[a] += size[b]
+
+    return merges
+
+
+def linkage_from_merges(merges, n):
+    # SciPy-style linkage matrix: row i merges clusters Z[i,0] < Z[i,1] (ids < n
+    # are points, n + j is the cluster made in row j) at distance Z[i,2] into a
+    # cluster of Z[i,3] points. Rows are in increasing distance order.
+    order = sorted(range(len(merges)), key=lambda i: merges[i][2])
+    cluster_of = list(range(n))  # slot -> current cluster id
+    size = [1] * (2 * n - 1)
+    Z = np.empty((len(merges), 4), dtype=np.float64)
+    for row, i in enumerate(order):
+        a, b, d = merges[i]
+        ca, cb = sorted((cluster_of[a], cluster_of[b]))
+        new_id = n + row
+        size[new_id] = size[ca] + size[cb]
+        Z[row] = (ca, cb, d, size[new_id])
+        cluster_of[a] = new_id
+    return Z
+
+
+def condensed_size(dist):
+    # number of points behind a condensed distance vector of length n(n-1)/2
+    n = int(round((1 + np.sqrt(1 + 8 * len(dist))) / 2))
+    if n * (n - 1) // 2 != len(dist):
+        raise ValueError("Distance vector length is not n(n-1)/2")
+    return n
+
+
+def working_copy(dist):
+    # copy of a condensed vector for nn_chain() to overwrite (float64; float32
+    # input stays float32, so a float32 memmap also halves the working copy)
+    dtype = np.float32 if np.asarray(dist[:0]).dtype == np.float32 else np.float64
+    return np.array(dist, dtype=dtype)
+
+
+def hierarchical_linkage(X=None, method="min", dist=None):
+    # Linkage matrix for points X, or for a precomputed condensed distance vector
+    if dist is None:
+        dist = pairwise_condensed(X)
+    n = condensed_size(dist)
+    return linkage_from_merges(nn_chain(working_copy(dist), n, method), n)
+
+
+def save_distances(X, path, dtype=np.float32):
+    # condensed distances written straight into a .npy file, for multi_linkage()
+    # to memory-map later (float32 halves the size of the n(n-1)/2 vector)
+    n = len(X)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n * (n - 1) // 2,))
+    pairwise_condensed(X, out=out)
+    out.flush()
+    return out
+
+
+def multi_linkage(dist, methods=LINKAGES, threads=1):
+    # Several linkages from one condensed distance vector (an array, or a path
+    # to a .npy file that gets memory-mapped). The vector is only read; each
+    # method works on its own condensed copy (working_copy()), so peak memory
+    # is one condensed vector per running method, never a dense n x n matrix.
+    # With threads > 1 the methods run side by side -- the NumPy row
+    # operations release the GIL. Returns {method: linkage matrix}.
+    if isinstance(dist, str):
+        dist = np.load(dist, mmap_mode="r")
+    n = condensed_size(dist)
+
+    def run(method):
+        return method, linkage_from_merges(nn_chain(working_copy(dist), n, method), n)
+
+    if threads <= 1 or len(methods) <= 1:
+        return dict(run(m) for m in methods)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(threads, len(methods))) as ex:
+        return dict(ex.map(run, methods))
+
+
+def merge_steps(Z):
+    # (left members, right members, distance) per row of a linkage matrix
+    n = len(Z) + 1
+    members = [[i] for i in range(n)]
+    steps = []
+    for a, b, d, _ in Z:
+        left, right = members[int(a)], members[int(b)]
+        steps.append((left, right, float(d)))
+        members.append(left + right)
+    return steps
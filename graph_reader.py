@@ -1,52 +1,110 @@
-import csv
-import networkx as nx
-import matplotlib.pyplot as plt
+import argparse
 
-# Create directed graph
-G = nx.DiGraph()
+import numpy as np
 
-# Read graph.csv
-with open("graph.csv", "r", newline="", encoding="utf-8") as file:
-    reader = csv.reader(file)
-    for row in reader:
-        # Remove extra spaces and ignore empty values
-        row = [item.strip() for item in row if item.strip()]
-        if len(row) < 1:
-            continue
+from pagerank import load_graph, pagerank, personalized_pagerank, save_scores, warm_start
 
-        parent = row[0]
+GRAPH_CSV = "graph.csv"
+GRAPH_CACHE = ".graph_cache/graph"  # binary edge arrays, rebuilt when graph.csv changes
+SCORES = ".graph_cache/scores.npz"  # last PageRank vector, used as the warm start
 
-        # Make sure parent exists even if it has no children
-        G.add_node(parent)
+# Incremental mode warm-starts from the last saved scores after graph.csv changes
+INCREMENTAL = True
+# Node names for personalized PageRank (e.g. ["Node1"]); None skips it
+SEEDS = None
 
-        # Add directed edges from parent to each child
-        for child in row[1:]:
-            G.add_edge(parent, child)
+# Drawing: "show" opens a window, "file" writes RENDER_PATH (.png/.svg) without
+# a display, "off" skips plotting (and the layout) entirely. Only the TOP_K
+# nodes by PageRank are drawn; above SPRING_MAX drawn nodes the O(n^2) spring
+# layout is swapped for a circular one.
+RENDER = "show"
+RENDER_PATH = "graph_pagerank.png"
+TOP_K = 300
+SPRING_MAX = 1000
 
-# Run PageRank
-pagerank_scores = nx.pagerank(G)
+
+def top_k_subgraph(nodes, src, dst, scores, k):
+    # node names of the k highest-ranked nodes (in graph order) and the edges among them
+    keep = np.ones(len(nodes), dtype=bool)
+    if k and k < len(nodes):
+        keep[:] = False
+        keep[np.argsort(-scores, kind="stable")[:k]] = True
+    mask = keep[src] & keep[dst]
+    names = [nodes[i] for i in np.flatnonzero(keep)]
+    return names, [(nodes[u], nodes[v]) for u, v in zip(src[mask], dst[mask])]
+
+
+def draw(nodes, src, dst, scores, render, out_path, k):
+    import matplotlib
+    if render == "file":
+        matplotlib.use("Agg")  # no display needed
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    # Directed graph for drawing only
+    names, edges = top_k_subgraph(nodes, src, dst, scores, k)
+    G = nx.DiGraph()
+    G.add_nodes_from(names)
+    G.add_edges_from(edges)
+
+    # Node sizes = weight * 3000
+    weights = dict(zip(nodes, scores))
+    node_sizes = [weights[node] * 3000 for node in G.nodes()]
+
+    # Draw graph
+    plt.figure(figsize=(10, 8))
+    if G.number_of_nodes() <= SPRING_MAX:
+        pos = nx.spring_layout(G, seed=42)
+    else:
+        pos = nx.circular_layout(G)
+
+    nx.draw(
+        G,
+        pos,
+        with_labels=G.number_of_nodes() <= 100,
+        node_size=node_sizes,
+        node_color="lightblue",
+        arrows=True,
+        font_size=10
+    )
+
+    title = "Directed Graph with PageRank Node Sizes"
+    if len(names) < len(nodes):
+        title += f" (top {len(names)} of {len(nodes)} nodes)"
+    plt.title(title)
+    if render == "file":
+        plt.savefig(out_path, bbox_inches="tight")
+        plt.close()
+        print(f"Saved graph drawing to {out_path}")
+    else:
+        plt.show()
+
+
+parser = argparse.ArgumentParser(description="PageRank over graph.csv")
+parser.add_argument("--render", choices=["show", "file", "off"], default=RENDER)
+parser.add_argument("--out", default=RENDER_PATH, help="image path for --render file (.png or .svg)")
+parser.add_argument("--top-k", type=int, default=TOP_K, help="draw only the K highest-ranked nodes (0 = all)")
+args = parser.parse_args()
+
+# Read graph.csv into integer edge arrays and run sparse PageRank
+nodes, src, dst = load_graph(GRAPH_CSV, GRAPH_CACHE)
+x0 = warm_start(SCORES, nodes) if INCREMENTAL else None
+scores, iterations = pagerank(src, dst, len(nodes), x0=x0)
+save_scores(SCORES, nodes, scores)
+pagerank_scores = dict(zip(nodes, scores))
+print(f"PageRank converged in {iterations} iterations ({'warm' if x0 is not None else 'cold'} start)")
 
 # Print PageRank weights
 print("PageRank Weights:")
 for node, score in pagerank_scores.items():
     print(f"{node}: {score:.6f}")
 
-# Node sizes = weight * 3000
-node_sizes = [pagerank_scores[node] * 3000 for node in G.nodes()]
-
-# Draw graph
-plt.figure(figsize=(10, 8))
-pos = nx.spring_layout(G, seed=42)
-
-nx.draw(
-    G,
-    pos,
-    with_labels=True,
-    node_size=node_sizes,
-    node_color="lightblue",
-    arrows=True,
-    font_size=10
-)
-
-plt.title("Directed Graph with PageRank Node Sizes")
-plt.show()
\ No newline at end of file
+if SEEDS:
+    index = {name: i for i, name in enumerate(nodes)}
+    ppr, _ = personalized_pagerank(src, dst, len(nodes), [index[name] for name in SEEDS])
+    print(f"\nPersonalized PageRank (seeds: {', '.join(SEEDS)}):")
+    for node, score in zip(nodes, ppr):
+        print(f"{node}: {score:.6f}")
+
+if args.render != "off":
+    draw(nodes, src, dst, scores, args.render, args.out, args.top_k)
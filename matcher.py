@@ -0,0 +1,202 @@
+import json
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from blocking import as_strings, merge_pairs
+
+# Multi-attribute weighted matcher. A rule set looks like:
+#
+#   {
+#     "threshold": 0.85,
+#     "attributes": [
+#       {"name": "director", "left": "director", "right": "title",
+#        "sim": "token_sort", "weight": 0.6, "min": 0.5},
+#       {"name": "release_year", "left": "release_year", "right": "release_year",
+#        "sim": "numeric", "scale": 2, "weight": 0.2}
+#     ]
+#   }
+#
+# Each attribute gives a similarity in [0, 1]. The pair score is the weighted mean
+# over the attributes present on both sides; a pair matches when score > threshold
+# and every attribute with a "min" is at least that similar.
+
+TEXT_SIMS = {
+    "ratio": fuzz.ratio,
+    "token_sort": fuzz.token_sort_ratio,
+    "token_set": fuzz.token_set_ratio,
+    "partial": fuzz.partial_ratio,
+}
+NUMERIC_SIMS = {"numeric", "exact"}
+
+# Same decision tablec_match.py always made: token_sort(A.director, B.title) > 85
+DEFAULT_RULES = {
+    "threshold": 0.85,
+    "attributes": [
+        {"name": "director", "left": "director", "right": "title",
+         "sim": "token_sort", "weight": 1.0},
+    ],
+}
+
+
+def check_rules(rules: dict) -> dict:
+    if "attributes" not in rules or not rules["attributes"]:
+        raise ValueError("Rule set has no attributes")
+    for attr in rules["attributes"]:
+        for key in ("left", "right", "sim"):
+            if key not in attr:
+                raise ValueError(f"Attribute rule is missing '{key}': {attr}")
+        if attr["sim"] not in TEXT_SIMS and attr["sim"] not in NUMERIC_SIMS:
+            raise ValueError(f"Unknown similarity '{attr['sim']}' in {attr}")
+        attr.setdefault("name", attr["left"])
+        attr.setdefault("weight", 1.0)
+    rules.setdefault("threshold", 0.85)
+    return rules
+
+
+def load_rules(path=None) -> dict:
+    if path is None:
+        return check_rules(json.loads(json.dumps(DEFAULT_RULES)))
+    with open(path, "r", encoding="utf-8") as f:
+        return check_rules(json.load(f))
+
+
+def sort_keys(values) -> np.ndarray:
+    # token_sort's own preprocessing, done once per row instead of once per pair
+    return np.array([" ".join(sorted(v.split())) for v in values], dtype=object)
+
+
+def prepare(df: pd.DataFrame, rules: dict, side: str, keys=None) -> dict:
+    # column arrays per attribute, built once per table: name -> (values, missing).
+    # keys: optional column -> sort-key array aligned with df (norm_index.py);
+    # token_sort attributes compare those with plain fuzz.ratio.
+    out = {}
+    for attr in rules["attributes"]:
+        col = attr[side]
+        s = df[col]
+        if attr["sim"] in TEXT_SIMS:
+            values = as_strings(s)
+            missing = s.isna().to_numpy() | np.array([not v.strip() for v in values], dtype=bool)
+            if attr["sim"] == "token_sort":
+                values = np.asarray(keys[col], dtype=object) if keys and col in keys else sort_keys(values)
+        else:
+            values = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+        out[attr["name"]] = (values, missing)
+    return out
+
+
+def attribute_sim(attr: dict, left, right, workers=1) -> np.ndarray:
+    # |left| x |right| similarity matrix in [0, 1]
+    sim = attr["sim"]
+    if sim in TEXT_SIMS:
+        # token_sort values are already sorted token strings (see prepare())
+        scorer = fuzz.ratio if sim == "token_sort" else TEXT_SIMS[sim]
+        scores = process.cdist(left, right, scorer=scorer,
+                               dtype=np.float64, workers=workers)
+        return scores / 100.0
+    diff = np.abs(left[:, None] - right[None, :])
+    if sim == "exact":
+        return (diff == 0).astype(np.float64)
+    scale = float(attr.get("scale", 1.0))
+    return np.clip(1.0 - diff / scale, 0.0, 1.0)
+
+
+def block_scores(left: dict, right: dict, a_pos, b_pos, rules: dict, workers=1):
+    # Weighted score matrix for one block plus a mask of pairs passing every "min".
+    shape = (len(a_pos), len(b_pos))
+    total = np.zeros(shape)
+    weight = np.zeros(shape)
+    ok = np.ones(shape, dtype=bool)
+
+    for attr in rules["attributes"]:
+        lv, lm = left[attr["name"]]
+        rv, rm = right[attr["name"]]
+        present = ~(lm[a_pos][:, None] | rm[b_pos][None, :])
+        sim = attribute_sim(attr, lv[a_pos], rv[b_pos], workers)
+        w = float(attr["weight"])
+        total += np.where(present, sim * w, 0.0)
+        weight += np.where(present, w, 0.0)
+        if "min" in attr:
+            ok &= ~present | (sim >= float(attr["min"]))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(weight > 0, total / weight, np.nan)
+    return scores, ok
+
+
+def score_block_list(left: dict, right: dict, blocks, rules: dict, workers=1):
+    threshold = float(rules["threshold"])
+    out_a, out_b, out_s = [], [], []
+    for a_pos, b_pos in blocks:
+        scores, ok = block_scores(left, right, a_pos, b_pos, rules, workers)
+        ai, bi = np.nonzero(ok & (scores > threshold))
+        out_a.append(a_pos[ai])
+        out_b.append(b_pos[bi])
+        out_s.append(scores[ai, bi])
+    return out_a, out_b, out_s
+
+
+def match_blocks(A: pd.DataFrame, B: pd.DataFrame, blocks, rules: dict, workers=1,
+                 left_keys=None, right_keys=None):
+    # Returns (a_pos, b_pos, score) for matching pairs, sorted by A row then B row.
+    left = prepare(A, rules, "left", left_keys)
+    right = prepare(B, rules, "right", right_keys)
+    return merge_pairs(*score_block_list(left, right, blocks, rules, workers))
+
+
+# ---------------- PROCESS POOL ----------------
+# The prepared column arrays live in this module global. With the "fork" start
+# method the workers inherit them from the parent, so a task only carries the
+# block index arrays. Elsewhere the initializer ships them once per worker.
+_SHARED = {}
+
+
+def _init_worker(left, right, rules):
+    _SHARED.update(left=left, right=right, rules=rules)
+
+
+def _match_chunk(chunk):
+    out_a, out_b, out_s = score_block_list(_SHARED["left"], _SHARED["right"],
+                                           chunk, _SHARED["rules"])
+    return merge_pairs(out_a, out_b, out_s)
+
+
+def match_blocks_parallel(A: pd.DataFrame, B: pd.DataFrame, blocks, rules: dict,
+                          workers=2, chunk_size=4, left_keys=None, right_keys=None):
+    # Same result as match_blocks(), with blocks spread over a process pool.
+    blocks = list(blocks)
+    if workers <= 1 or len(blocks) <= 1:
+        return match_blocks(A, B, blocks, rules, left_keys=left_keys, right_keys=right_keys)
+
+    left = prepare(A, rules, "left", left_keys)
+    right = prepare(B, rules, "right", right_keys)
+
+    if "fork" in mp.get_all_start_methods():
+        ctx = mp.get_context("fork")
+        _init_worker(left, right, rules)
+        init, initargs = None, ()
+    else:
+        ctx = mp.get_context()
+        init, initargs = _init_worker, (left, right, rules)
+
+    # biggest blocks first so one large year doesn't finish last
+    blocks.sort(key=lambda blk: len(blk[0]) * len(blk[1]), reverse=True)
+    chunks = [blocks[i:i + chunk_size] for i in range(0, len(blocks), chunk_size)]
+
+    out_a, out_b, out_s = [], [], []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=init, initargs=initargs) as ex:
+            for a, b, s in ex.map(_match_chunk, chunks):
+                out_a.append(a)
+                out_b.append(b)
+                out_s.append(s)
+    finally:
+        _SHARED.clear()
+
+    # merge_pairs sorts by (A row, B row), so pair IDs don't depend on finish order
+    return merge_pairs(out_a, out_b, out_s)
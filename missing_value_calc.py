@@ -1,14 +1,12 @@
-import pandas as pd
-# read and display missing values for each csv file
-A = pd.read_csv("tableA.csv")
-B = pd.read_csv("tableB.csv")
+from table_stats import scan_table
+# read and display missing values for each csv file (chunked, one pass per table)
+A = scan_table("tableA.csv", hist_cols=())
+B = scan_table("tableB.csv", hist_cols=())
 
 print("TABLE A MISSING")
-missing_A = A.isnull().sum()
-percent_A = (missing_A / len(A)) * 100
+percent_A = A.missing_percent()
 print(percent_A)
 
 print("\nTABLE B MISSING")
-missing_B = B.isnull().sum()
-percent_B = (missing_B / len(B)) * 100
+percent_B = B.missing_percent()
 print(percent_B)
\ No newline at end of file
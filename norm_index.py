@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by DataFrame.to_feather)
+except ImportError:  # the index is rebuilt on every run without pyarrow
+    pyarrow = None
+
+from blocking import STOPWORDS
+from Project_1_temp.classwork.table_schema import read_table
+
+# Normalization index: the string keys matching and blocking need, computed once
+# per record over whole columns and saved, so the hot loops only look them up.
+# Per record ID and column:
+#
+#   norm      normalize(): lowercase, runs of non-[a-z0-9] -> one space
+#   sort_key  whitespace tokens of the raw text, sorted and re-joined; fuzz.ratio
+#             on two sort keys equals fuzz.token_sort_ratio on the raw strings
+#   tokens    blocking.tokens() as a sorted, space-joined string
+#   qgrams    blocking.qgrams() (q=3, over norm with spaces removed) as a
+#             sorted, space-joined string
+#
+# Saved indexes live under INDEX_DIR as Feather, one file per (table file,
+# column), and are rebuilt when the table file is newer or, when the caller
+# passes the loaded table, when its IDs no longer line up with the index.
+
+INDEX_DIR = ".norm_index"
+Q = 3
+
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    # vectorized blocking.normalize(); missing values become ""
+    s = s.astype("string").fillna("")
+    return s.str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+
+
+def sort_key_series(s: pd.Series) -> pd.Series:
+    # raw text as str() shows it ("nan" for missing), like blocking.as_strings()
+    text = s.astype(object).where(s.notna(), "nan").astype(str)
+    return pd.Series([" ".join(sorted(t.split())) for t in text], index=s.index, dtype=object)
+
+
+def token_series(norm: pd.Series) -> pd.Series:
+    def key(t):
+        return " ".join(sorted({w for w in t.split() if w not in STOPWORDS and len(w) > 1}))
+    return pd.Series([key(t) for t in norm], index=norm.index, dtype=object)
+
+
+def qgram_series(compact: pd.Series, q=Q) -> pd.Series:
+    def grams(t):
+        if len(t) <= q:
+            return t
+        return " ".join(sorted({t[i:i + q] for i in range(len(t) - q + 1)}))
+    return pd.Series([grams(t) for t in compact], index=compact.index, dtype=object)
+
+
+def build_index(df: pd.DataFrame, col: str, id_col="ID") -> pd.DataFrame:
+    # one row per record, in table order
+    norm = normalize_series(df[col])
+    compact = norm.str.replace(" ", "", regex=False)
+    return pd.DataFrame({
+        "ID": df[id_col].astype(str).to_numpy(),
+        "norm": norm.to_numpy(dtype=object),
+        "sort_key": sort_key_series(df[col]).to_numpy(),
+        "tokens": token_series(norm).to_numpy(),
+        "qgrams": qgram_series(compact).to_numpy(),
+    })
+
+
+def same_ids(idx: pd.DataFrame, df: pd.DataFrame, id_col="ID") -> bool:
+    return (len(idx) == len(df)
+            and bool((idx["ID"].to_numpy() == df[id_col].astype(str).to_numpy()).all()))
+
+
+def index_path(table_path: str, col: str, index_dir=INDEX_DIR) -> str:
+    # keep the extension: tableA.csv and tableA.parquet get separate indexes
+    name = os.path.basename(table_path)
+    return os.path.join(index_dir, f"{name}.{col}.feather")
+
+
+def load_index(table_path: str, col: str, df=None, index_dir=INDEX_DIR) -> pd.DataFrame:
+    # Saved index when it is newer than the table (and, given `df`, has the
+    # same IDs in the same order), else build (from `df` when the caller
+    # already has the table loaded) and save it
+    path = index_path(table_path, col, index_dir)
+    if (pyarrow is not None and os.path.exists(path)
+            and os.path.getmtime(path) >= os.path.getmtime(table_path)):
+        idx = pd.read_feather(path)
+        if df is None or same_ids(idx, df):
+            return idx
+    if df is None:
+        df = read_table(table_path)
+    idx = build_index(df, col)
+    if pyarrow is not None:
+        os.makedirs(index_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        idx.to_feather(tmp)
+        os.replace(tmp, path)
+    return idx
+
+
+def row_sets(idx: pd.DataFrame, field="tokens") -> list:
+    # per-row sets of a space-joined key column: "tokens" for
+    # blocking.candidate_blocks(keys=...), "qgrams" for blocking.lsh_blocks()
+    return [set(t.split()) for t in idx[field]]
@@ -0,0 +1,179 @@
+import csv
+import os
+from array import array
+from itertools import islice
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # falls back to a NumPy bincount mat-vec
+    sp = None
+
+# Sparse PageRank for graph_reader.py. The graph is a pair of int arrays
+# (src, dst) over nodes 0..n-1; power iteration runs on a CSR matrix, so cost
+# is O(edges) per iteration with no per-node Python objects. Same definition as
+# nx.pagerank: dangling nodes spread their rank by the personalization vector,
+# and iteration stops when the L1 change drops below n * tol.
+
+ALPHA = 0.85
+TOL = 1.0e-6
+MAX_ITER = 100
+
+
+class PowerIterationFailedConvergence(RuntimeError):
+    pass
+
+
+# ---------------- LOADING ----------------
+# graph.csv is streamed row by row; node names are interned once into dense
+# int32 ids through one dict, and edges go into compact int32 arrays. The
+# result can be saved as <prefix>.edges.npy (2 x E, int32) + <prefix>.nodes.txt
+# so later runs memory-map the edges instead of parsing the CSV again.
+CHUNK_ROWS = 100000
+
+
+def read_graph_csv(path, chunk_rows=CHUNK_ROWS):
+    # Adjacency-list CSV (parent, child, child, ...) -> (node names, src, dst).
+    # Nodes are numbered in first-seen order, the order nx.DiGraph would keep.
+    ids = {}
+    src, dst = array("i"), array("i")
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+            for row in rows:
+                # strip each cell once; ignore empty values
+                cells = [c for c in (item.strip() for item in row) if c]
+                if not cells:
+                    continue
+                parent = ids.setdefault(cells[0], len(ids))
+                for child in cells[1:]:
+                    src.append(parent)
+                    dst.append(ids.setdefault(child, len(ids)))
+    return (list(ids),
+            np.frombuffer(src, dtype=np.int32) if src else np.empty(0, np.int32),
+            np.frombuffer(dst, dtype=np.int32) if dst else np.empty(0, np.int32))
+
+
+def save_graph(prefix, nodes, src, dst):
+    folder = os.path.dirname(prefix)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # nodes first: the edges file is what load_graph() checks for freshness
+    with open(prefix + ".nodes.txt", "w", encoding="utf-8") as f:
+        for name in nodes:
+            f.write(name + "\n")
+    np.save(prefix + ".edges.npy", np.vstack([src, dst]).astype(np.int32))
+
+
+def load_saved_graph(prefix):
+    # edges are memory-mapped (no copy until a computation touches them)
+    edges = np.load(prefix + ".edges.npy", mmap_mode="r")
+    with open(prefix + ".nodes.txt", "r", encoding="utf-8") as f:
+        nodes = f.read().split("\n")[:-1]
+    return nodes, edges[0], edges[1]
+
+
+def load_graph(csv_path, prefix=None):
+    # From the binary copy when it is newer than the CSV, else parse and save it
+    if prefix is None:
+        return read_graph_csv(csv_path)
+    saved = prefix + ".edges.npy"
+    if (os.path.exists(saved) and os.path.exists(prefix + ".nodes.txt")
+            and os.path.getmtime(saved) >= os.path.getmtime(csv_path)):
+        return load_saved_graph(prefix)
+    nodes, src, dst = read_graph_csv(csv_path)
+    save_graph(prefix, nodes, src, dst)
+    return nodes, src, dst
+
+
+def dedupe_edges(src, dst, n):
+    # a DiGraph keeps one edge per (u, v), however often the CSV lists it
+    if len(src) == 0:
+        return src, dst
+    key = np.unique(src.astype(np.int64) * n + dst)
+    return key // n, key % n
+
+
+# ---------------- MATRIX ----------------
+def transition(src, dst, n):
+    # Column-stochastic transition matrix as CSR (row = target) plus the dangling
+    # mask. Without scipy, a (src, dst, weight) triple is returned instead and
+    # used through bincount.
+    out_deg = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_deg == 0
+    w = 1.0 / out_deg[src]
+    if sp is not None:
+        M = sp.csr_matrix((w, (dst, src)), shape=(n, n))
+    else:
+        M = (src, dst, w)
+    return M, dangling
+
+
+def matvec(M, x, n):
+    if sp is not None:
+        return M @ x
+    src, dst, w = M
+    return np.bincount(dst, weights=x[src] * w, minlength=n)
+
+
+# ---------------- POWER ITERATION ----------------
+def power_iteration(M, dangling, n, alpha=ALPHA, personalization=None, x0=None,
+                    tol=TOL, max_iter=MAX_ITER):
+    # Returns (scores, iterations). personalization and x0 are length-n arrays
+    # (normalized here); both default to uniform.
+    p = np.full(n, 1.0 / n) if personalization is None else personalization / personalization.sum()
+    x = np.full(n, 1.0 / n) if x0 is None else x0 / x0.sum()
+
+    for it in range(1, max_iter + 1):
+        xlast = x
+        x = alpha * (matvec(M, x, n) + x[dangling].sum() * p) + (1 - alpha) * p
+        if np.abs(x - xlast).sum() < n * tol:
+            return x / x.sum(), it
+    raise PowerIterationFailedConvergence(f"PageRank did not converge in {max_iter} iterations")
+
+
+def pagerank(src, dst, n, alpha=ALPHA, personalization=None, x0=None,
+             tol=TOL, max_iter=MAX_ITER):
+    # PageRank vector for the graph (src, dst) over n nodes, and the number of
+    # iterations it took. x0 warm-starts the power iteration (see warm_start()).
+    if n == 0:
+        return np.empty(0), 0
+    src, dst = dedupe_edges(src, dst, n)
+    M, dangling = transition(src, dst, n)
+    return power_iteration(M, dangling, n, alpha=alpha, personalization=personalization,
+                           x0=x0, tol=tol, max_iter=max_iter)
+
+
+def personalized_pagerank(src, dst, n, seeds, alpha=ALPHA, x0=None, tol=TOL, max_iter=MAX_ITER):
+    # PageRank with teleports (and dangling rank) going only to the seed node ids
+    seeds = np.asarray(list(seeds), dtype=np.int64)
+    if len(seeds) == 0:
+        raise ValueError("Personalized PageRank needs at least one seed node")
+    p = np.zeros(n)
+    p[seeds] = 1.0
+    return pagerank(src, dst, n, alpha=alpha, personalization=p, x0=x0, tol=tol, max_iter=max_iter)
+
+
+# ---------------- WARM START ----------------
+# Scores are saved by node name, so after graph.csv changes the previous vector
+# can seed the next power iteration; small edits then converge in a few steps.
+def save_scores(path, nodes, scores):
+    np.savez(path, nodes=np.asarray(nodes, dtype=str), scores=np.asarray(scores, dtype=np.float64))
+
+
+def warm_start(path, nodes):
+    # start vector over `nodes` from saved scores: known nodes keep their old
+    # score, new nodes start at 1/n; None when nothing was saved yet
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        old = dict(zip(saved["nodes"].tolist(), saved["scores"]))
+    if not old:
+        return None
+    n = len(nodes)
+    x0 = np.array([old.get(name, 1.0 / n) for name in nodes], dtype=np.float64)
+    return x0 if x0.sum() > 0 else None
@@ -1,8 +1,38 @@
+import sys
+
 import pandas as pd
 import numpy as np
 
+from clustering import (csv_batches, kmeans, merge_steps, minibatch_kmeans, multi_linkage,
+                        pairwise_condensed, predict, standardized, streaming_stats)
+
+DATA_CSV = "USArrests.csv"
+
+# python project6.py --minibatch  -> stream DATA_CSV in batches instead of
+# loading it (for data bigger than RAM); only k-means runs in that mode
+MINIBATCH = "--minibatch" in sys.argv
+BATCH_SIZE = 10000
+
+
+if MINIBATCH:
+    # pass 1: standardization stats; then mini-batch epochs over standardized batches
+    source = csv_batches(DATA_CSV, BATCH_SIZE)
+    mean, std, n_rows = streaming_stats(source)
+    print(f"Streamed {n_rows} rows")
+
+    print("\n===== MINI-BATCH K-MEANS =====")
+    centroids, history = minibatch_kmeans(standardized(source, mean, std), K=4, seed=42)
+
+    sizes = np.zeros(len(centroids), dtype=np.int64)
+    for labels in predict(standardized(source, mean, std), centroids):
+        sizes += np.bincount(labels, minlength=len(centroids))
+    for i, size in enumerate(sizes):
+        print(f"Cluster {i+1}: {size} rows")
+    sys.exit(0)
+
+
 # Load dataset
-df = pd.read_csv("USArrests.csv")
+df = pd.read_csv(DATA_CSV)
 
 # Save state names separately
 states = df.iloc[:, 0]
@@ -19,49 +49,9 @@ def standardize(X):
 X = standardize(data)
 
 
-# Euclidean distance
-def euclidean_distance(a, b):
-    return np.sqrt(np.sum((a - b) ** 2))
-
-
-# K-means clustering
-def kmeans(X, K=4, max_iters=100):
-    n_samples, n_features = X.shape
-
-    # Randomly choose initial centroids
-    indices = np.random.choice(n_samples, K, replace=False)
-    centroids = X[indices]
-
-    for _ in range(max_iters):
-        clusters = [[] for _ in range(K)]
-
-        # Assign points to closest centroid
-        for i, point in enumerate(X):
-            distances = [euclidean_distance(point, c) for c in centroids]
-            cluster_index = np.argmin(distances)
-            clusters[cluster_index].append(i)
-
-        # Compute new centroids
-        new_centroids = []
-        for cluster in clusters:
-            if len(cluster) > 0:
-                new_centroids.append(np.mean(X[cluster], axis=0))
-            else:
-                new_centroids.append(centroids[len(new_centroids)])
-
-        new_centroids = np.array(new_centroids)
-
-        # Stop if centroids do not change
-        if np.allclose(centroids, new_centroids):
-            break
-
-        centroids = new_centroids
-
-    return clusters, centroids
-
-
-# Run K-means
-clusters, centroids = kmeans(X, K=4)
+# Run K-means (vectorized engine in clustering.py, k-means++ seeding)
+labels, centroids = kmeans(X, K=4, seed=42)
+clusters = [np.flatnonzero(labels == k) for k in range(len(centroids))]
 
 print("\n===== K-MEANS CLUSTERING RESULTS =====")
 for i, cluster in enumerate(clusters):
@@ -70,64 +60,14 @@ for i, cluster in enumerate(clusters):
         print(states.iloc[index])
 
 
-# Distance between two clusters
-def cluster_distance(c1, c2, X, method="min"):
-    distances = []
-
-    for i in c1:
-        for j in c2:
-            distances.append(euclidean_distance(X[i], X[j]))
-
-    if method == "min":
-        return min(distances)
-    elif method == "max":
-        return max(distances)
-    elif method == "average":
-        return np.mean(distances)
-
-
-# Hierarchical clustering
-def hierarchical_clustering(X, method="min"):
-    clusters = [[i] for i in range(len(X))]
-    merge_steps = []
-
-    while len(clusters) > 1:
-        min_dist = float("inf")
-        to_merge = (0, 1)
-
-        for i in range(len(clusters)):
-            for j in range(i + 1, len(clusters)):
-                dist = cluster_distance(clusters[i], clusters[j], X, method)
-
-                if dist < min_dist:
-                    min_dist = dist
-                    to_merge = (i, j)
-
-        i, j = to_merge
-
-        new_cluster = clusters[i] + clusters[j]
-        merge_steps.append((clusters[i], clusters[j], min_dist))
-
-        # Remove higher index first
-        clusters.pop(j)
-        clusters.pop(i)
-        clusters.append(new_cluster)
-
-    return merge_steps
-
-
-# Run hierarchical clustering for all 3 linkage methods
-print("\n===== HIERARCHICAL CLUSTERING: MIN LINKAGE =====")
-min_steps = hierarchical_clustering(X, method="min")
-for step in min_steps[:10]:
-    print(step)
-
-print("\n===== HIERARCHICAL CLUSTERING: MAX LINKAGE =====")
-max_steps = hierarchical_clustering(X, method="max")
-for step in max_steps[:10]:
-    print(step)
+# Hierarchical clustering (nearest-neighbor chain + Lance-Williams in clustering.py).
+# The distance matrix is computed once and shared by all three linkages; each
+# result is a list of merge steps (cluster A members, cluster B members, distance).
+dist = pairwise_condensed(X)
+linkages = multi_linkage(dist, methods=("min", "max", "average"), threads=3)
 
-print("\n===== HIERARCHICAL CLUSTERING: AVERAGE LINKAGE =====")
-avg_steps = hierarchical_clustering(X, method="average")
-for step in avg_steps[:10]:
-    print(step)
\ No newline at end of file
+# Print the first merges for all 3 linkage methods
+for method, label in [("min", "MIN"), ("max", "MAX"), ("average", "AVERAGE")]:
+    print(f"\n===== HIERARCHICAL CLUSTERING: {label} LINKAGE =====")
+    for step in merge_steps(linkages[method])[:10]:
+        print(step)
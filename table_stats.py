@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from Project_1_temp.classwork.table_schema import iter_table, table_columns, table_format
+
+# Streaming column statistics for the table reports. Tables are read in chunks
+# with dtype=str; each chunk of each column is stripped once, and everything
+# the profile needs (missing count, type inference, distinct count, text
+# lengths) is taken from that one pass. Only counters and the 64-bit hashes of
+# distinct values are kept between chunks, so large tables never sit in memory.
+
+CHUNK_ROWS = 100_000
+BOOLEAN_VALUES = {"true", "false", "0", "1", "yes", "no"}
+
+
+class ColumnProfile:
+    def __init__(self, name: str, hist=False):
+        self.name = name
+        self.rows = 0
+        self.missing = 0      # NaN or blank
+        self.numeric = 0      # non-missing values that parse as numbers
+        self.boolean = True   # every non-missing value is boolean-ish so far
+        self.len_sum = 0
+        self.len_min = None
+        self.len_max = None
+        self._distinct = np.empty(0, dtype=np.uint64)
+        self._hashes = []  # per-chunk unique hashes, merged once in `distinct`
+        self.lengths = BucketHistogram()  # text lengths of non-missing values
+        self.values = BucketHistogram() if hist else None  # numeric values
+
+    @property
+    def present(self) -> int:
+        return self.rows - self.missing
+
+    @property
+    def distinct(self) -> int:
+        if self._hashes:
+            self._distinct = np.unique(np.concatenate([self._distinct] + self._hashes))
+            self._hashes = []
+        return len(self._distinct)
+
+    def update(self, s: pd.Series):
+        self.rows += len(s)
+        s = s.astype("string")  # NA-aware .str even when a chunk is all NaN
+        stripped = s.str.strip()
+        keep = stripped.notna() & (stripped != "")
+        self.missing += int((~keep).sum())
+        values = s[keep]
+        if len(values) == 0:
+            return
+
+        numbers = pd.to_numeric(stripped[keep], errors="coerce")
+        self.numeric += int(numbers.notna().sum())
+        if self.values is not None:
+            self.values.update(numbers.to_numpy(dtype=np.float64, na_value=np.nan))
+        if self.boolean:
+            self.boolean = bool(values.str.lower().isin(BOOLEAN_VALUES).all())
+
+        lens = values.str.len().to_numpy(dtype=np.int64)
+        self.len_sum += int(lens.sum())
+        lo, hi = int(lens.min()), int(lens.max())
+        self.len_min = lo if self.len_min is None else min(self.len_min, lo)
+        self.len_max = hi if self.len_max is None else max(self.len_max, hi)
+        self.lengths.update(lens)
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self._hashes.append(np.unique(hashes))
+
+    def add_missing(self, n: int):
+        # rows of a column the table does not have
+        self.rows += n
+        self.missing += n
+
+    def classify(self) -> str:
+        # quick heuristic classification
+        n = self.present
+        if n == 0:
+            return "Unknown (all missing)"
+        if self.boolean:
+            return "boolean"
+        if self.numeric / n > 0.90:
+            return "numeric"
+        # categorical-ish (low unique count relative to rows)
+        if self.distinct / n < 0.20:
+            return "categorical"
+        return "textual"
+
+    def avg_len(self):
+        return self.len_sum / self.present if self.present else None
+
+
+def read_chunks(path: str, columns=None, chunksize=CHUNK_ROWS):
+    # str chunks of `columns` (those the file has); Parquet/Feather tables are
+    # read through table_schema and shown as text, the way the CSV reads
+    header = table_columns(path)
+    usecols = list(header) if columns is None else [c for c in columns if c in header]
+    if table_format(path) == "csv":
+        return pd.read_csv(path, dtype=str, usecols=usecols, chunksize=chunksize)
+    return (chunk.astype("string") for chunk in iter_table(path, usecols, chunksize))
+
+
+def profile_csv(path: str, columns, chunksize=CHUNK_ROWS, hist_cols=()) -> dict:
+    # column -> ColumnProfile, in one chunked pass over the file; columns the
+    # file lacks are profiled as all missing. hist_cols also get a histogram
+    # of their numeric values (ColumnProfile.values).
+    profiles = {col: ColumnProfile(col, hist=col in hist_cols) for col in columns}
+    for chunk in read_chunks(path, columns, chunksize):
+        for col, prof in profiles.items():
+            if col in chunk.columns:
+                prof.update(chunk[col])
+            else:
+                prof.add_missing(len(chunk))
+    return profiles
+
+
+# ---------------- NULL COUNTS + HISTOGRAMS ----------------
+# Whole-table aggregates for the missing-value and histogram reports. Numeric
+# columns go into fixed-width buckets (width 1 by default: one per year or per
+# minute), so memory depends on the value range, not the row count. At plot
+# time the buckets are re-binned into plt.hist-style bins over [min, max],
+# which gives the same bars as plt.hist on the raw column for integer data.
+HIST_COLS = ("release_year", "runtime_minutes")
+
+
+class BucketHistogram:
+    def __init__(self, width=1.0):
+        self.width = width
+        self.counts = {}  # bucket key -> count
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        keys, counts = np.unique(np.floor(values / self.width).astype(np.int64), return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            self.counts[k] = self.counts.get(k, 0) + c
+        lo, hi = float(values.min()), float(values.max())
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def bins(self, bins=20):
+        # (counts, edges) like np.histogram(column, bins) -- bucket values stand
+        # in for the raw values, exact when they are multiples of `width`
+        if not self.counts:
+            return np.histogram([], bins=bins)
+        keys = np.fromiter(self.counts, dtype=np.float64, count=len(self.counts))
+        weights = np.fromiter(self.counts.values(), dtype=np.float64, count=len(self.counts))
+        values = np.clip(keys * self.width, self.min, self.max)
+        return np.histogram(values, bins=bins, range=(self.min, self.max), weights=weights)
+
+    def plot(self, ax, bins=20, **kwargs):
+        counts, edges = self.bins(bins)
+        return ax.hist(edges[:-1], bins=edges, weights=counts, **kwargs)
+
+
+class TableStats:
+    def __init__(self, hist_cols=HIST_COLS, width=1.0):
+        self.rows = 0
+        self.nulls = None  # column -> null count, in file order
+        self.hists = {col: BucketHistogram(width) for col in hist_cols}
+
+    def update(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        nulls = chunk.isnull().sum()
+        self.nulls = nulls if self.nulls is None else self.nulls + nulls
+        for col, hist in self.hists.items():
+            if col in chunk.columns:
+                hist.update(pd.to_numeric(chunk[col], errors="coerce"))
+
+    def missing_percent(self) -> pd.Series:
+        return (self.nulls / self.rows) * 100
+
+
+def scan_table(path: str, hist_cols=HIST_COLS, chunksize=CHUNK_ROWS) -> TableStats:
+    # null counts for every column and histograms for hist_cols, in one chunked read
+    stats = TableStats(hist_cols)
+    for chunk in read_chunks(path, chunksize=chunksize):
+        stats.update(chunk)
+    if stats.nulls is None:
+        stats.nulls = pd.Series(0, index=table_columns(path), dtype=np.int64)
+    return stats
@@ -1,34 +1,124 @@
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
-from rapidfuzz import fuzz
 
-A = pd.read_csv("tableA.csv")
-B = pd.read_csv("tableB.csv")
+from blocking import candidate_blocks, distinct_pairs, lsh_blocks, pair_blocks, within_years
+from matcher import load_rules, match_blocks_parallel
+from norm_index import load_index, row_sets
+from Project_1_temp.classwork.table_schema import read_table
+
+# Input tables: .csv, .parquet or .feather (see Project_1_temp.classwork.table_schema)
+TABLE_A = "tableA.csv"
+TABLE_B = "tableB.csv"
+
+# Blocking config: YEAR_WINDOW=1 also compares against +-1 year (--year-window).
+# KEY_COLS turns on token blocking inside each year block, e.g.
+# (["director"], ["title"]) -- B's title column holds the director names.
+YEAR_WINDOW = 0
+KEY_COLS = None
+
+# None keeps the original director-vs-title rule; "match_rules.json" scores
+# director (B.title), release_year and runtime_minutes together (--rules).
+RULES_PATH = None
+
+# MinHash/LSH candidates (--lsh): 3-gram sets of these columns are hashed into
+# LSH_BANDS bands of LSH_ROWS values each. The buckets ignore years, so the
+# candidates are then cut to YEAR_WINDOW like release_year blocking before
+# scoring; the default rule only compares names and would otherwise match
+# a director's films across years. More bands or fewer rows -> more
+# candidates and higher recall. Buckets holding more than LSH_MAX_BUCKET B rows
+# (a shingle set shared by far more rows than one director's films) are
+# skipped so their cross product cannot blow up; 0 keeps every bucket.
+LSH_COLS = (["director"], ["title"])
+LSH_BANDS = 32
+LSH_ROWS = 4
+LSH_MAX_BUCKET = 50
+
+
+def text_index(path, df, cols, rows):
+    # column -> normalization index rows for df[rows] (built once, then reused)
+    return {col: load_index(path, col, df)[rows].reset_index(drop=True) for col in set(cols)}
+
+
+def key_sets(index, cols, field="tokens"):
+    # per-row union of key sets over cols, like blocking.row_keys()
+    sets = [row_sets(index[col], field) for col in cols]
+    return [set().union(*row) for row in zip(*sets)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match tableA against tableB into tableC.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for block scoring (0 = all cores)")
+    parser.add_argument("--lsh", action="store_true",
+                        help="MinHash/LSH candidates instead of release_year blocking")
+    parser.add_argument("--bands", type=int, default=LSH_BANDS)
+    parser.add_argument("--rows", type=int, default=LSH_ROWS)
+    parser.add_argument("--max-bucket", type=int, default=LSH_MAX_BUCKET,
+                        help="skip LSH buckets with more B rows than this (0 = no limit)")
+    parser.add_argument("--year-window", type=int, default=YEAR_WINDOW,
+                        help="max release_year difference of a candidate pair")
+    parser.add_argument("--rules", default=RULES_PATH,
+                        help="JSON matching rules (default: director-vs-title rule)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    A = read_table(TABLE_A)
+    B = read_table(TABLE_B)
+
+    # Keep only likely movie rows from A
+    A_movies = A[A["runtime_minutes"].notna()].reset_index(drop=True)
+
+    rules = load_rules(args.rules)
+    if args.lsh:
+        left_cols, right_cols = LSH_COLS
+    else:
+        left_cols, right_cols = KEY_COLS or ([], [])
+    right_cols = right_cols or left_cols
 
-# Keep only likely movie rows from A
-A_movies = A[A["runtime_minutes"].notna()].copy()
+    # Normalized keys come from the saved per-column index, not per-pair work
+    sorted_attrs = [a for a in rules["attributes"] if a["sim"] == "token_sort"]
+    a_index = text_index(TABLE_A, A, [a["left"] for a in sorted_attrs] + list(left_cols),
+                         A["runtime_minutes"].notna().to_numpy())
+    b_index = text_index(TABLE_B, B, [a["right"] for a in sorted_attrs] + list(right_cols),
+                         np.ones(len(B), dtype=bool))
+    left_keys = {col: idx["sort_key"].to_numpy() for col, idx in a_index.items()}
+    right_keys = {col: idx["sort_key"].to_numpy() for col, idx in b_index.items()}
 
-matches = []
-pair_id = 0
+    if args.lsh:
+        lsh = list(lsh_blocks(key_sets(a_index, left_cols, "qgrams"),
+                              key_sets(b_index, right_cols, "qgrams"),
+                              bands=args.bands, rows=args.rows, max_bucket=args.max_bucket))
+        blocks = list(within_years(pair_blocks(lsh, len(B)), A_movies, B, window=args.year_window))
+    else:
+        keys = (key_sets(a_index, left_cols), key_sets(b_index, right_cols)) if KEY_COLS else None
+        blocks = list(candidate_blocks(A_movies, B, window=args.year_window, keys=keys))
 
-for _, a in A_movies.iterrows():
-    candidates = B[B["release_year"] == a["release_year"]]
+    a_idx, b_idx, _ = match_blocks_parallel(A_movies, B, blocks, rules, workers=workers,
+                                            left_keys=left_keys, right_keys=right_keys)
 
-    for _, b in candidates.iterrows():
-        director_score = fuzz.token_sort_ratio(str(a["director"]), str(b["title"]))
+    C = pd.DataFrame({
+        "ID": range(len(a_idx)),
+        "ltable_ID": A_movies["ID"].to_numpy()[a_idx],
+        "rtable_ID": B["ID"].to_numpy()[b_idx],
+    })
+    C.to_csv("tableC.csv", index=False)
 
-        if director_score > 85:
-            matches.append({
-                "ID": pair_id,
-                "ltable_ID": a["ID"],
-                "rtable_ID": b["ID"]
-            })
-            pair_id += 1
+    print("Matches found:", len(C))
+    print("A size:", len(A))
+    print("B size:", len(B))
+    print("Cartesian product:", len(A) * len(B))
+    print("Filtered A movie rows:", len(A_movies))
+    print("Candidate pairs after blocking:", distinct_pairs(blocks, len(B)))
+    if args.lsh:
+        pairs = distinct_pairs(blocks, len(B))
+        print(f"LSH candidate pairs ({args.bands} bands x {args.rows} rows): "
+              f"{distinct_pairs(lsh, len(B))} distinct, {pairs} within "
+              f"{args.year_window} year(s) -- {pairs / (len(A) * len(B)):.4%} of the "
+              f"Cartesian product ({len(A) * len(B) / max(pairs, 1):.0f}x fewer)")
 
-C = pd.DataFrame(matches)
-C.to_csv("tableC.csv", index=False)
 
-print("Matches found:", len(C))
-print("A size:", len(A))
-print("B size:", len(B))
-print("Cartesian product:", len(A) * len(B))
-print("Filtered A movie rows:", len(A_movies))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
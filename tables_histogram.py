@@ -1,14 +1,15 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-# read csv files
-tableA = pd.read_csv("tableA.csv")
-tableB = pd.read_csv("tableB.csv")
+
+from table_stats import scan_table
+# read csv files once each, in chunks; histograms come from the bucket counts
+tableA = scan_table("tableA.csv")
+tableB = scan_table("tableB.csv")
 
 # release year histogram
 
 plt.figure()
-plt.hist(tableA["release_year"].dropna(), bins=20, alpha=0.5, label="Table A")
-plt.hist(tableB["release_year"].dropna(), bins=20, alpha=0.5, label="Table B")
+tableA.hists["release_year"].plot(plt.gca(), bins=20, alpha=0.5, label="Table A")
+tableB.hists["release_year"].plot(plt.gca(), bins=20, alpha=0.5, label="Table B")
 plt.xlabel("Release Year")
 plt.ylabel("Frequency")
 plt.title("Release Year Distribution")
@@ -19,8 +20,8 @@ plt.close()
 # runtime histogram
 
 plt.figure()
-plt.hist(tableA["runtime_minutes"].dropna(), bins=20, alpha=0.5, label="Table A")
-plt.hist(tableB["runtime_minutes"].dropna(), bins=20, alpha=0.5, label="Table B")
+tableA.hists["runtime_minutes"].plot(plt.gca(), bins=20, alpha=0.5, label="Table A")
+tableB.hists["runtime_minutes"].plot(plt.gca(), bins=20, alpha=0.5, label="Table B")
 plt.xlabel("Runtime (minutes)")
 plt.ylabel("Frequency")
 plt.title("Runtime Distribution")